@@ -4,14 +4,23 @@ React Project Setup Script
 Creates a new React project with Vite, TypeScript, Tailwind CSS, and optional Telegram WebApp support
 """
 
+import time
+SCRIPT_START = time.perf_counter()
+
+# Heavy modules (asyncio, subprocess, concurrent.futures, difflib, ...) are
+# imported inside the functions that need them to keep cold start short.
 import os
 import sys
-import subprocess
 import json
 import shutil
+import re
+import importlib
+from contextlib import contextmanager
 from pathlib import Path
 import argparse
 
+IMPORTS_DONE = time.perf_counter()
+
 # Colors for terminal output
 class Colors:
     GREEN = '\033[92m'
@@ -22,6 +31,63 @@ class Colors:
     CYAN = '\033[96m'
     RESET = '\033[0m'
 
+# Local npm cache and lockfile seeds (used with --cache-dir)
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "create-react-project"
+
+# Per-step timeouts (seconds) for run_command(), overridable with --timeout
+STEP_TIMEOUTS = {
+    "default": 120,
+    "create": 120,
+    "install": 900
+}
+
+# Settings shared by every run_command() call (see configure_command_runner)
+RUNNER_SETTINGS = {
+    "timeouts": dict(STEP_TIMEOUTS),
+    "log_path": None
+}
+
+RSS_SAMPLE_INTERVAL = 0.5
+KILL_GRACE_PERIOD = 5
+STREAM_CHUNK_SIZE = 65536
+
+# Hashes of the generated files, used by --update
+STATE_FILE_NAME = ".create-react-project.json"
+
+# Node.js version for the generated Dockerfile when node is not available locally
+DEFAULT_NODE_VERSION = "20"
+
+# Cached node/npm versions, keyed by the node binary (see probe_node)
+NODE_PROBE_CACHE = DEFAULT_CACHE_DIR / "node-probe.json"
+
+# Version of create-vite whose react-ts template is embedded in create_vite_template()
+VITE_TEMPLATE_VERSION = "create-vite 7.1.1"
+
+# Основные изменения для React Router v7
+DEPENDENCIES = [
+    "react-router@latest",  # Единый пакет React Router v7
+    "axios",
+    "jwt-decode",
+    "dayjs",
+    "clsx",
+    "tailwind-merge",
+    "tailwindcss",
+    "@tailwindcss/vite",
+    "tw-animate-css"
+]
+
+TELEGRAM_DEPENDENCIES = [
+    "@telegram-apps/sdk"
+]
+
+DEV_DEPENDENCIES = [
+    "@types/react",
+    "@types/react-dom",
+    "@types/jwt-decode",
+    "typescript"
+    # @types/react-router-dom больше не нужен
+]
+
 def print_info(message):
     print(f"{Colors.BLUE}ℹ️  {message}{Colors.RESET}")
 
@@ -34,64 +100,368 @@ def print_warning(message):
 def print_error(message):
     print(f"{Colors.RED}❌ {message}{Colors.RESET}")
 
-def run_command(command, cwd=None):
-    """Run a shell command and return success status"""
+@contextmanager
+def timed_phase(timings, phase):
+    """Measure the wall time of a setup phase and store it in timings"""
+    start = time.perf_counter()
     try:
-        print_info(f"Executing: {command}")
-        result = subprocess.run(
-            command, 
-            shell=True, 
-            cwd=cwd, 
-            capture_output=True, 
-            text=True,
-            timeout=120  # 2 minute timeout
-        )
-        
-        if result.returncode != 0:
-            print_error(f"Command failed: {command}")
-            if result.stdout:
-                print_error(f"Stdout: {result.stdout}")
-            if result.stderr:
-                print_error(f"Stderr: {result.stderr}")
-            return False
-        
-        if result.stdout:
-            print_info(f"Output: {result.stdout.strip()}")
-            
-        return True
+        yield
+    finally:
+        timings[phase] = time.perf_counter() - start
+
+def print_timings(timings, milliseconds=False):
+    """Print how long each setup phase took"""
+    if not timings:
+        return
+    
+    def format_duration(seconds):
+        return f"{seconds * 1000:8.1f}ms" if milliseconds else f"{seconds:7.2f}s"
+    
+    width = max(len(phase) for phase in [*timings, "total"])
+    print(f"{Colors.BLUE}Phase timings:{Colors.RESET}")
+    for phase, seconds in timings.items():
+        print(f"  {phase.ljust(width)}  {format_duration(seconds)}")
+    print(f"  {'total'.ljust(width)}  {format_duration(sum(timings.values()))}")
+
+def configure_command_runner(timeouts=None, log_path=None):
+    """Set per-step timeouts and the structured command log for run_command()"""
+    if timeouts:
+        RUNNER_SETTINGS["timeouts"].update(timeouts)
+    RUNNER_SETTINGS["log_path"] = log_path
+
+def process_tree_rss_kb(root_pid):
+    """Return the summed VmRSS (KiB) of a process and its descendants.
+    
+    Reads /proc, so it returns None on systems without procfs.
+    """
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+    
+    children = {}
+    rss = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            status = (entry / "status").read_text()
+        except OSError:
+            continue
         
-    except subprocess.TimeoutExpired:
-        print_error(f"Command timed out: {command}")
-        return False
+        ppid = None
+        vmrss = 0
+        for line in status.splitlines():
+            if line.startswith("PPid:"):
+                ppid = int(line.split()[1])
+            elif line.startswith("VmRSS:"):
+                vmrss = int(line.split()[1])
+        pid = int(entry.name)
+        rss[pid] = vmrss
+        children.setdefault(ppid, []).append(pid)
+    
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+def write_command_log(record):
+    """Append one command record to the JSON lines log, if enabled"""
+    log_path = RUNNER_SETTINGS["log_path"]
+    if log_path is None:
+        return
+    
+    try:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print_warning(f"Could not write command log: {str(e)}")
+
+async def stream_output(stream, lines, color=""):
+    """Print a subprocess stream line by line as it arrives.
+    
+    The stream is read in chunks and split here rather than with readline(),
+    which fails on lines longer than the StreamReader limit (64 KiB).
+    """
+    def emit(raw_line):
+        line = raw_line.decode("utf-8", errors="replace").rstrip()
+        lines.append(line)
+        print(f"    {color}{line}{Colors.RESET if color else ''}", flush=True)
+    
+    buffer = b""
+    while True:
+        chunk = await stream.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        for raw_line in complete:
+            emit(raw_line)
+    if buffer:
+        emit(buffer)
+
+async def terminate_process(process):
+    """Stop the whole process group: SIGTERM first, SIGKILL after a grace period"""
+    import asyncio
+    import signal
+    
+    if process.returncode is not None:
+        return
+    
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), KILL_GRACE_PERIOD)
+        except asyncio.TimeoutError:
+            os.killpg(process.pid, signal.SIGKILL)
+            await process.wait()
+    except ProcessLookupError:
+        pass
+
+async def run_command_async(command, cwd, timeout, record):
+    """Run command, stream its output and fill record with the result"""
+    import asyncio
+    
+    process = await asyncio.create_subprocess_shell(
+        command,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True  # own process group, so npm's children are stopped too
+    )
+    
+    async def sample_rss():
+        while True:
+            rss = await asyncio.to_thread(process_tree_rss_kb, process.pid)
+            if rss is not None:
+                record["peak_rss_kb"] = max(record["peak_rss_kb"] or 0, rss)
+            await asyncio.sleep(RSS_SAMPLE_INTERVAL)
+    
+    sampler = asyncio.create_task(sample_rss())
+    stderr_lines = []
+    try:
+        await asyncio.wait_for(asyncio.gather(
+            stream_output(process.stdout, []),
+            stream_output(process.stderr, stderr_lines, Colors.YELLOW),
+            process.wait()
+        ), timeout)
+    except asyncio.TimeoutError:
+        record["status"] = "timeout"
+        await terminate_process(process)
+    except asyncio.CancelledError:
+        record["status"] = "cancelled"
+        await terminate_process(process)
+        raise
+    except BaseException:
+        await terminate_process(process)
+        raise
+    finally:
+        sampler.cancel()
+        record["exit_code"] = process.returncode
+    
+    if record["status"] is None:
+        record["status"] = "ok" if process.returncode == 0 else "failed"
+
+def run_command(command, cwd=None, step="default"):
+    """Run a shell command, streaming its output, and return success status.
+    
+    The timeout comes from RUNNER_SETTINGS["timeouts"][step]. Wall time, peak
+    RSS of the process tree and exit status are written to the command log.
+    """
+    import asyncio
+    from datetime import datetime, timezone
+    
+    timeouts = RUNNER_SETTINGS["timeouts"]
+    timeout = timeouts.get(step, timeouts["default"])
+    record = {
+        "command": command,
+        "cwd": str(cwd) if cwd is not None else None,
+        "step": step,
+        "timeout": timeout,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "wall_time": None,
+        "peak_rss_kb": None,
+        "exit_code": None,
+        "status": None
+    }
+    
+    print_info(f"Executing: {command}")
+    start = time.perf_counter()
+    try:
+        asyncio.run(run_command_async(command, cwd, timeout, record))
+    except KeyboardInterrupt:
+        record["status"] = "cancelled"
+        print_error(f"Command cancelled: {command}")
+        raise
     except Exception as e:
+        record["status"] = "error"
         print_error(f"Error running command: {command}")
         print_error(f"Exception: {str(e)}")
         return False
+    finally:
+        record["wall_time"] = round(time.perf_counter() - start, 3)
+        write_command_log(record)
+    
+    if record["status"] == "timeout":
+        print_error(f"Command timed out after {timeout}s: {command}")
+        return False
+    if record["status"] != "ok":
+        print_error(f"Command failed with exit code {record['exit_code']}: {command}")
+        return False
+    
+    return True
 
-def check_node_installed():
-    """Check if Node.js and npm are installed"""
+def read_npm_version(npm_path):
+    """Read the npm version from npm's package.json on disk instead of running npm"""
+    npm_path = Path(npm_path)
+    candidates = [parent / "package.json" for parent in npm_path.resolve().parents]
+    # Windows installs: npm.cmd sits next to node.exe, npm lives in node_modules/npm
+    candidates.append(npm_path.parent / "node_modules" / "npm" / "package.json")
+    
+    for package_json_path in candidates:
+        if not package_json_path.is_file():
+            continue
+        try:
+            with open(package_json_path, 'r', encoding='utf-8') as f:
+                package_json = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if package_json.get("name") == "npm":
+            return package_json.get("version"), package_json_path
+    return None, None
+
+def load_node_probe_cache():
     try:
-        # Check Node.js
-        node_result = subprocess.run(["node", "--version"], capture_output=True, text=True, shell=True)
-        if node_result.returncode != 0:
-            print_error(f"Node.js not found: {node_result.stderr.strip()}")
-            return False
-        
-        # Check npm
-        npm_result = subprocess.run(["npm", "--version"], capture_output=True, text=True, shell=True)
+        with open(NODE_PROBE_CACHE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_node_probe_cache(cache):
+    try:
+        NODE_PROBE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(NODE_PROBE_CACHE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        pass
+
+def probe_node(use_cache=True):
+    """Find node and npm on PATH and return their versions.
+    
+    Results are cached per Node install and reused while the mtimes of the
+    node binary and npm's package.json are unchanged, so a warm probe does
+    not spawn any process.
+    """
+    node_path = shutil.which("node")
+    npm_path = shutil.which("npm")
+    if node_path is None or npm_path is None:
+        return None
+    
+    node_real_path = str(Path(node_path).resolve())
+    npm_version, npm_package_json = read_npm_version(npm_path)
+    key = {
+        "node_mtime": os.stat(node_real_path).st_mtime_ns,
+        "npm_path": str(Path(npm_path).resolve()),
+        "npm_mtime": os.stat(npm_package_json).st_mtime_ns if npm_package_json else None
+    }
+    
+    cache = load_node_probe_cache() if use_cache else {}
+    cached = cache.get(node_real_path)
+    if cached is not None and all(cached.get(name) == value for name, value in key.items()):
+        return {**cached, "node_path": node_real_path, "cached": True}
+    
+    import subprocess
+    
+    node_result = subprocess.run([node_real_path, "--version"], capture_output=True, text=True,
+                                 stdin=subprocess.DEVNULL, timeout=30)
+    if node_result.returncode != 0:
+        raise RuntimeError(f"node --version failed: {node_result.stderr.strip()}")
+    
+    if npm_version is None:
+        # npm layout not recognised - fall back to asking npm itself
+        npm_result = subprocess.run([npm_path, "--version"], capture_output=True, text=True,
+                                    stdin=subprocess.DEVNULL, timeout=30)
         if npm_result.returncode != 0:
-            print_error(f"npm not found: {npm_result.stderr.strip()}")
-            return False
+            raise RuntimeError(f"npm --version failed: {npm_result.stderr.strip()}")
+        npm_version = npm_result.stdout.strip()
+    
+    probe = {**key, "node_version": node_result.stdout.strip().lstrip("v"), "npm_version": npm_version}
+    if use_cache:
+        cache[node_real_path] = probe
+        save_node_probe_cache(cache)
+    
+    return {**probe, "node_path": node_real_path, "cached": False}
+
+def check_node_installed(use_cache=True):
+    """Check if Node.js and npm are installed.
+    
+    Returns the probe result (see probe_node) or None if they are missing.
+    """
+    try:
+        probe = probe_node(use_cache)
+        if probe is None:
+            print_error("Node.js or npm not found in PATH")
+            return None
         
-        print_success(f"Node.js {node_result.stdout.strip()}, npm {npm_result.stdout.strip()} detected")
-        return True
+        source = " (cached)" if probe["cached"] else ""
+        print_success(f"Node.js v{probe['node_version']}, npm {probe['npm_version']} detected{source}")
+        return probe
         
-    except FileNotFoundError:
-        print_error("Node.js or npm not found in PATH")
-        return False
     except Exception as e:
         print_error(f"Error checking Node.js installation: {str(e)}")
-        return False
+        return None
+
+def interpreter_startup_seconds():
+    """Return the time between process creation and the first line of this script.
+    
+    Uses /proc, so it returns None on systems without procfs.
+    """
+    try:
+        with open("/proc/self/stat", 'r') as f:
+            # Field 22 (starttime) - skip past the command name, which may contain spaces
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", 'r') as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    
+    started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    elapsed_since_script_start = time.perf_counter() - SCRIPT_START
+    return max(uptime - started - elapsed_since_script_start, 0.0)
+
+def report_startup_time(parse_seconds):
+    """Print a breakdown of the script's cold-start cost"""
+    timings = {}
+    
+    interpreter = interpreter_startup_seconds()
+    if interpreter is not None:
+        timings["interpreter startup"] = interpreter
+    timings["module imports"] = IMPORTS_DONE - SCRIPT_START
+    timings["argument parsing"] = parse_seconds
+    
+    # Modules imported lazily, only by the steps that need them
+    # (asyncio goes last because it pulls in concurrent.futures itself)
+    for module in ("subprocess", "hashlib", "tempfile", "difflib", "concurrent.futures", "asyncio"):
+        already_loaded = module in sys.modules
+        with timed_phase(timings, f"deferred import: {module}{' (loaded)' if already_loaded else ''}"):
+            importlib.import_module(module)
+    
+    with timed_phase(timings, "node probe (uncached)"):
+        probe = probe_node(use_cache=False)
+    # Warm the cache first so the second measurement is a real cache hit
+    probe_node(use_cache=True)
+    with timed_phase(timings, "node probe (cached)"):
+        probe_node(use_cache=True)
+    
+    if probe is not None:
+        print_info(f"Node.js v{probe['node_version']}, npm {probe['npm_version']} ({probe['node_path']})")
+    else:
+        print_warning("Node.js or npm not found in PATH")
+    print_timings(timings, milliseconds=True)
 
 def create_project_structure(project_path):
     """Create the project folder structure"""
@@ -109,21 +479,322 @@ def create_project_structure(project_path):
     
     print_success("Project structure created")
 
-def create_file(file_path, content):
-    """Create a file with the given content"""
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+class FileManifest:
+    """Declarative list of generated files: relative path -> content producer.
+    
+    A producer is either a string or a callable returning one. write() renders
+    every file first, stages them as temp files in parallel and only then
+    renames them into place, so a failed run never leaves half-written files.
+    """
+    
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.entries = {}
+    
+    def add(self, relative_path, producer):
+        self.entries[relative_path] = producer
+    
+    def render(self):
+        """Return {relative path: content} for every entry"""
+        return {
+            relative_path: producer() if callable(producer) else producer
+            for relative_path, producer in self.entries.items()
+        }
+    
+    def _stage(self, relative_path, content, mode):
+        import tempfile
+        
+        target = self.project_path / relative_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.chmod(temp_path, mode)
+        return target, Path(temp_path)
+    
+    def write(self, max_workers=8):
+        """Write all files atomically and return the number of files written"""
+        return self.write_files(self.render(), max_workers)
+    
+    def write_files(self, files, max_workers=8):
+        """Atomically write already rendered {relative path: content} files"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        # mkstemp creates files with 0600, restore the usual umask-based mode
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._stage, relative_path, content, mode)
+                for relative_path, content in files.items()
+            ]
+        
+        staged = [future.result() for future in futures if future.exception() is None]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            for _, temp_path in staged:
+                temp_path.unlink(missing_ok=True)
+            raise errors[0]
+        
+        for target, temp_path in staged:
+            os.replace(temp_path, target)
+        
+        return len(staged)
+    
+    def status(self):
+        """Compare the manifest with the files on disk.
+        
+        Returns a list of (relative path, state) where state is one of
+        'new', 'changed', 'unchanged' or 'pending' (the producer needs files
+        that only exist after the install step, e.g. package.json).
+        """
+        result = []
+        for relative_path, producer in self.entries.items():
+            try:
+                content = producer() if callable(producer) else producer
+            except FileNotFoundError:
+                result.append((relative_path, "pending"))
+                continue
+            
+            target = self.project_path / relative_path
+            if not target.exists():
+                state = "new"
+            elif target.read_text(encoding='utf-8') != content:
+                state = "changed"
+            else:
+                state = "unchanged"
+            result.append((relative_path, state))
+        return result
+    
+    def diff(self):
+        """Return a unified diff between the files on disk and the manifest"""
+        import difflib
+        
+        chunks = []
+        for relative_path, state in self.status():
+            if state not in ("new", "changed"):
+                continue
+            
+            producer = self.entries[relative_path]
+            content = producer() if callable(producer) else producer
+            target = self.project_path / relative_path
+            current = target.read_text(encoding='utf-8') if target.exists() else ""
+            chunks.extend(difflib.unified_diff(
+                current.splitlines(keepends=True),
+                content.splitlines(keepends=True),
+                fromfile=f"a/{relative_path}",
+                tofile=f"b/{relative_path}"
+            ))
+        return "".join(chunks)
+
+def npm_package_name(name):
+    """Turn a directory name into a valid npm package name"""
+    return re.sub(r"[^a-z0-9~._-]+", "-", name.lower()).strip("-.") or "vite-project"
+
+def create_vite_template(manifest):
+    """Write the embedded Vite react-ts base template (see VITE_TEMPLATE_VERSION)"""
+    package_name = npm_package_name(manifest.project_path.name)
+    
+    package_json = {
+        "name": package_name,
+        "private": True,
+        "version": "0.0.0",
+        "type": "module",
+        "scripts": {
+            "dev": "vite",
+            "build": "tsc -b && vite build",
+            "lint": "eslint .",
+            "preview": "vite preview"
+        },
+        "dependencies": {
+            "react": "^19.1.1",
+            "react-dom": "^19.1.1"
+        },
+        "devDependencies": {
+            "@eslint/js": "^9.33.0",
+            "@types/react": "^19.1.10",
+            "@types/react-dom": "^19.1.7",
+            "@vitejs/plugin-react": "^5.0.0",
+            "eslint": "^9.33.0",
+            "eslint-plugin-react-hooks": "^5.2.0",
+            "eslint-plugin-react-refresh": "^0.4.20",
+            "globals": "^16.3.0",
+            "typescript": "~5.8.3",
+            "typescript-eslint": "^8.39.1",
+            "vite": "^7.1.2"
+        }
+    }
+    manifest.add("package.json", json.dumps(package_json, indent=2) + "\n")
+    
+    index_html = '''<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>Vite + React + TS</title>
+  </head>
+  <body>
+    <div id="root"></div>
+    <script type="module" src="/src/main.tsx"></script>
+  </body>
+</html>
+'''
+    manifest.add("index.html", index_html)
+    
+    tsconfig = '''{
+  "files": [],
+  "references": [
+    { "path": "./tsconfig.app.json" },
+    { "path": "./tsconfig.node.json" }
+  ]
+}
+'''
+    manifest.add("tsconfig.json", tsconfig)
+    
+    tsconfig_app = '''{
+  "compilerOptions": {
+    "tsBuildInfoFile": "./node_modules/.tmp/tsconfig.app.tsbuildinfo",
+    "target": "ES2022",
+    "useDefineForClassFields": true,
+    "lib": ["ES2022", "DOM", "DOM.Iterable"],
+    "module": "ESNext",
+    "skipLibCheck": true,
+
+    /* Bundler mode */
+    "moduleResolution": "bundler",
+    "allowImportingTsExtensions": true,
+    "verbatimModuleSyntax": true,
+    "moduleDetection": "force",
+    "noEmit": true,
+    "jsx": "react-jsx",
+
+    /* Linting */
+    "strict": true,
+    "noUnusedLocals": true,
+    "noUnusedParameters": true,
+    "erasableSyntaxOnly": true,
+    "noFallthroughCasesInSwitch": true,
+    "noUncheckedSideEffectImports": true
+  },
+  "include": ["src"]
+}
+'''
+    manifest.add("tsconfig.app.json", tsconfig_app)
+    
+    tsconfig_node = '''{
+  "compilerOptions": {
+    "tsBuildInfoFile": "./node_modules/.tmp/tsconfig.node.tsbuildinfo",
+    "target": "ES2023",
+    "lib": ["ES2023"],
+    "module": "ESNext",
+    "skipLibCheck": true,
+
+    /* Bundler mode */
+    "moduleResolution": "bundler",
+    "allowImportingTsExtensions": true,
+    "verbatimModuleSyntax": true,
+    "moduleDetection": "force",
+    "noEmit": true,
+
+    /* Linting */
+    "strict": true,
+    "noUnusedLocals": true,
+    "noUnusedParameters": true,
+    "erasableSyntaxOnly": true,
+    "noFallthroughCasesInSwitch": true,
+    "noUncheckedSideEffectImports": true
+  },
+  "include": ["vite.config.ts"]
+}
+'''
+    manifest.add("tsconfig.node.json", tsconfig_node)
+    
+    eslint_config = '''import js from '@eslint/js'
+import globals from 'globals'
+import reactHooks from 'eslint-plugin-react-hooks'
+import reactRefresh from 'eslint-plugin-react-refresh'
+import tseslint from 'typescript-eslint'
+import { globalIgnores } from 'eslint/config'
+
+export default tseslint.config([
+  globalIgnores(['dist']),
+  {
+    files: ['**/*.{ts,tsx}'],
+    extends: [
+      js.configs.recommended,
+      tseslint.configs.recommended,
+      reactHooks.configs['recommended-latest'],
+      reactRefresh.configs.vite,
+    ],
+    languageOptions: {
+      ecmaVersion: 2020,
+      globals: globals.browser,
+    },
+  },
+])
+'''
+    manifest.add("eslint.config.js", eslint_config)
+    
+    gitignore = '''# Logs
+logs
+*.log
+npm-debug.log*
+yarn-debug.log*
+yarn-error.log*
+pnpm-debug.log*
+lerna-debug.log*
+
+node_modules
+dist
+dist-ssr
+*.local
+
+# Editor directories and files
+.vscode/*
+!.vscode/extensions.json
+.idea
+.DS_Store
+*.suo
+*.ntvs*
+*.njsproj
+*.sln
+*.sw?
+'''
+    manifest.add(".gitignore", gitignore)
+    
+    main_tsx = '''import { StrictMode } from 'react'
+import { createRoot } from 'react-dom/client'
+import './index.css'
+import App from './App.tsx'
+
+createRoot(document.getElementById('root')!).render(
+  <StrictMode>
+    <App />
+  </StrictMode>,
+)
+'''
+    manifest.add("src/main.tsx", main_tsx)
+    manifest.add("src/vite-env.d.ts", '/// <reference types="vite/client" />\n')
 
-def setup_vite_project(project_path):
+def setup_vite_project(project_path, cache_dir=None, offline=False, template_source="embedded"):
     """Create Vite React TypeScript project"""
     print_info("Creating Vite React TypeScript project...")
     
-    # Use echo to automatically answer "n" to rolldown question
-    command = 'echo "n" | npm create vite@latest . -- --template react-ts'
-    
-    if not run_command(command, cwd=project_path):
-        print_error("Failed to create Vite project")
-        return False
+    if template_source == "embedded":
+        print_info(f"Using embedded template ({VITE_TEMPLATE_VERSION})")
+        manifest = FileManifest(project_path)
+        create_vite_template(manifest)
+        manifest.write()
+        (project_path / "public").mkdir(exist_ok=True)
+    else:
+        # Use echo to automatically answer "n" to rolldown question
+        command = f'echo "n" | npm create {npm_cache_flags(cache_dir, offline)} vite@latest . -- --template react-ts'
+        
+        if not run_command(command, cwd=project_path, step="create"):
+            print_error("Failed to create Vite project")
+            return False
     
     # Verify that project was created successfully
     if not (project_path / "package.json").exists():
@@ -133,51 +804,203 @@ def setup_vite_project(project_path):
     print_success("Vite project created successfully")
     return True
 
-def install_dependencies(project_path, project_type):
-    """Install project dependencies with React Router v7"""
-    print_info("Installing base dependencies...")
+def get_dependencies(project_type):
+    """Return (dependencies, dev_dependencies) for the given project type"""
+    dependencies = list(DEPENDENCIES)
+    if project_type == "telegram":
+        dependencies += TELEGRAM_DEPENDENCIES
     
-    if not run_command("npm install", cwd=project_path):
-        return False
+    return dependencies, list(DEV_DEPENDENCIES)
+
+def npm_cache_flags(cache_dir, offline=False):
+    """Build npm flags that point npm at the local package cache"""
+    if cache_dir is None:
+        return ""
     
-    print_info("Installing additional dependencies...")
-    
-    # Основные изменения для React Router v7
-    dependencies = [
-        "react-router@latest",  # Единый пакет React Router v7
-        "axios", 
-        "jwt-decode",
-        "dayjs",
-        "clsx",
-        "tailwind-merge",
-        "tailwindcss",
-        "@tailwindcss/vite",
-        "tw-animate-css"
-    ]
+    flags = f'--cache "{cache_dir / "npm"}" --prefer-offline'
+    if offline:
+        flags += " --offline"
+    return flags
+
+def get_dependency_key(project_type, template=None):
+    """Return a short hash of the dependency lists (and optionally the base template)"""
+    dependencies, dev_dependencies = get_dependencies(project_type)
+    spec = {
+        "project_type": project_type,
+        "dependencies": dependencies,
+        "devDependencies": dev_dependencies
+    }
+    if template is not None:
+        spec["template"] = template
     
-    if project_type == "telegram":
-        dependencies.append("@telegram-apps/sdk")
+    return content_hash(json.dumps(spec, sort_keys=True))[:16]
+
+def get_lockfile_seed_dir(cache_dir, project_type, template_source="embedded"):
+    """Return the lockfile seed directory for the project type.
     
-    deps_command = f"npm install {' '.join(dependencies)}"
-    if not run_command(deps_command, cwd=project_path):
-        return False
+    The directory name includes a hash of the base template and the dependency
+    lists, so changing either in this script never reuses a stale lockfile.
+    """
+    template = VITE_TEMPLATE_VERSION if template_source == "embedded" else "create-vite@latest"
+    key = get_dependency_key(project_type, template)
     
-    print_info("Installing dev dependencies...")
+    return cache_dir / "lockfiles" / f"{project_type}-{key}"
+
+def save_lockfile_seed(project_path, seed_dir):
+    """Store package.json and package-lock.json as the seed for later runs"""
+    try:
+        seed_dir.mkdir(parents=True, exist_ok=True)
+        for file_name in ("package.json", "package-lock.json"):
+            shutil.copyfile(project_path / file_name, seed_dir / file_name)
+        print_success(f"Lockfile seed saved: {seed_dir}")
+    except Exception as e:
+        print_warning(f"Could not save lockfile seed: {str(e)}")
+
+def install_from_lockfile_seed(project_path, seed_dir, cache_dir, offline):
+    """Install dependencies with npm ci from a previously saved lockfile seed"""
+    print_info(f"Using lockfile seed: {seed_dir}")
     
-    dev_dependencies = [
-        "@types/react",
-        "@types/react-dom", 
-        "@types/jwt-decode",
-        "typescript"
-        # @types/react-router-dom больше не нужен
-    ]
+    # The seed carries the name of the project it was taken from
+    package_json_path = project_path / "package.json"
+    package_name = None
+    if package_json_path.exists():
+        with open(package_json_path, 'r') as f:
+            package_name = json.load(f).get("name")
+    package_name = package_name or npm_package_name(project_path.name)
+    
+    for file_name in ("package.json", "package-lock.json"):
+        shutil.copyfile(seed_dir / file_name, project_path / file_name)
+    
+    for file_name in ("package.json", "package-lock.json"):
+        with open(project_path / file_name, 'r') as f:
+            data = json.load(f)
+        data["name"] = package_name
+        if file_name == "package-lock.json" and "" in data.get("packages", {}):
+            data["packages"][""]["name"] = package_name
+        with open(project_path / file_name, 'w') as f:
+            json.dump(data, f, indent=2)
+            if file_name == "package-lock.json":
+                f.write("\n")
+    
+    if not run_command(f"npm ci {npm_cache_flags(cache_dir, offline=True)}", cwd=project_path, step="install"):
+        if offline:
+            return False
+        
+        # The npm cache may have been pruned - retry with network access
+        print_warning("Offline install failed, retrying with network access...")
+        if not run_command(f"npm ci {npm_cache_flags(cache_dir)}", cwd=project_path, step="install"):
+            return False
+    
+    print_success("Dependencies installed from lockfile seed")
+    return True
+
+def parse_package_spec(package):
+    """Split 'name@range' into (name, range), keeping scoped package names intact"""
+    name, separator, version = package.rpartition("@")
+    if not separator or not name:
+        return package, "latest"
+    return name, version
+
+def write_dependencies(project_path, project_type, only_missing=False):
+    """Write the full dependency and devDependency set into package.json.
+    
+    With only_missing=True, packages already listed keep their version range.
+    """
+    print_info("Writing dependencies to package.json...")
+    
+    package_json_path = project_path / "package.json"
+    with open(package_json_path, 'r') as f:
+        package_json = json.load(f)
+    
+    dependencies, dev_dependencies = get_dependencies(project_type)
+    for section, packages in (("dependencies", dependencies), ("devDependencies", dev_dependencies)):
+        entries = package_json.setdefault(section, {})
+        for package in packages:
+            name, version = parse_package_spec(package)
+            if only_missing and name in entries:
+                continue
+            entries[name] = version
+        package_json[section] = dict(sorted(entries.items()))
+    
+    with open(package_json_path, 'w') as f:
+        json.dump(package_json, f, indent=2)
     
-    dev_deps_command = f"npm install --save-dev {' '.join(dev_dependencies)}"
-    if not run_command(dev_deps_command, cwd=project_path):
+    print_success("Dependencies written to package.json")
+    return True
+
+def pin_installed_versions(project_path):
+    """Replace dist-tags like 'latest' with the caret range of the installed version.
+    
+    The root entry of package-lock.json is updated as well, so the lockfile
+    stays in sync with package.json and `npm ci` keeps working.
+    """
+    package_json_path = project_path / "package.json"
+    lockfile_path = project_path / "package-lock.json"
+    
+    with open(package_json_path, 'r') as f:
+        package_json = json.load(f)
+    lockfile = None
+    if lockfile_path.exists():
+        with open(lockfile_path, 'r') as f:
+            lockfile = json.load(f)
+    
+    for section in ("dependencies", "devDependencies"):
+        for name, version in package_json.get(section, {}).items():
+            if version[:1].isdigit() or version[:1] in "^~<>=*":
+                continue
+            
+            installed_path = project_path / "node_modules" / name / "package.json"
+            if not installed_path.exists():
+                continue
+            with open(installed_path, 'r') as f:
+                installed_version = json.load(f)["version"]
+            
+            package_json[section][name] = f"^{installed_version}"
+            if lockfile is not None:
+                root = lockfile.get("packages", {}).get("", {})
+                if name in root.get(section, {}):
+                    root[section][name] = f"^{installed_version}"
+    
+    with open(package_json_path, 'w') as f:
+        json.dump(package_json, f, indent=2)
+    if lockfile is not None:
+        with open(lockfile_path, 'w') as f:
+            json.dump(lockfile, f, indent=2)
+            f.write("\n")
+
+def install_dependencies(project_path, project_type, cache_dir=None, offline=False, template_source="embedded",
+                         use_seed=True):
+    """Install project dependencies with React Router v7 in a single npm transaction.
+    
+    write_dependencies() must have been called first, so package.json already
+    holds the full dependency set and npm resolves the tree only once.
+    use_seed=False skips lockfile seeds (used by --update, where package.json
+    belongs to the existing project).
+    """
+    seed_dir = None
+    if cache_dir is not None and use_seed:
+        seed_dir = get_lockfile_seed_dir(cache_dir, project_type, template_source)
+        if (seed_dir / "package-lock.json").exists():
+            return install_from_lockfile_seed(project_path, seed_dir, cache_dir, offline)
+        
+        if offline:
+            print_error(f"No lockfile seed for '{project_type}' in {cache_dir}")
+            print_error("Run once without --offline to seed the cache")
+            return False
+    
+    print_info("Installing dependencies...")
+    
+    if not run_command(f"npm install {npm_cache_flags(cache_dir, offline)}", cwd=project_path, step="install"):
         return False
     
+    pin_installed_versions(project_path)
+    
+    if seed_dir is not None:
+        save_lockfile_seed(project_path, seed_dir)
+    
     print_success("Dependencies installed with React Router v7")
     return True
+
 def setup_tailwind(project_path):
     """Setup Tailwind CSS v4 - no initialization needed"""
     print_info("Setting up Tailwind CSS v4...")
@@ -188,10 +1011,8 @@ def setup_tailwind(project_path):
     print_success("Tailwind CSS v4 setup completed")
     return True
 
-def update_config_files(project_path):
+def update_config_files(manifest):
     """Update configuration files for Tailwind CSS v4"""
-    print_info("Updating configuration files...")
-    
     # Update vite.config.ts for Tailwind v4
     vite_config = '''import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
@@ -211,14 +1032,10 @@ export default defineConfig({
   },
 })
 '''
-    create_file(project_path / "vite.config.ts", vite_config)
-    
-    print_success("Configuration files updated for Tailwind v4")
+    manifest.add("vite.config.ts", vite_config)
 
-def create_css_file(project_path):
+def create_css_file(manifest):
     """Create the CSS file with Tailwind v4 configuration"""
-    print_info("Creating CSS file with Tailwind v4 configuration...")
-    
     css_content = '''@import "tailwindcss";
 @import "tw-animate-css";
 
@@ -342,10 +1159,9 @@ def create_css_file(project_path):
     }
 }
 '''
-    create_file(project_path / "src" / "index.css", css_content)
-    print_success("CSS file created with Tailwind v4 configuration")
+    manifest.add("src/index.css", css_content)
 
-def create_type_definitions(project_path):
+def create_type_definitions(manifest):
     """Create TypeScript type definitions for React Router v7"""
     types_content = '''export interface AuthState {
   isAuthenticated: boolean;
@@ -379,11 +1195,9 @@ export interface RouteError {
   stack?: string;
 }
 '''
-    create_file(project_path / "src" / "types" / "types.ts", types_content)
-def create_utils(project_path):
+    manifest.add("src/types/types.ts", types_content)
+def create_utils(manifest):
     """Create utility files"""
-    print_info("Creating utility files...")
-    
     # cn utility
     utils_content = '''import { clsx, type ClassValue } from "clsx"
 import { twMerge } from "tailwind-merge"
@@ -392,7 +1206,7 @@ export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
 }
 '''
-    create_file(project_path / "src" / "lib" / "utils.ts", utils_content)
+    manifest.add("src/lib/utils.ts", utils_content)
     
     # useAPI utility
     use_api_content = '''import axios from "axios";
@@ -438,7 +1252,7 @@ const useAxios = () => {
 
 export default useAxios;
 '''
-    create_file(project_path / "src" / "utils" / "useApi.ts", use_api_content)
+    manifest.add("src/utils/useApi.ts", use_api_content)
     
     # API functions
     api_content = '''import axios from "axios";
@@ -476,9 +1290,9 @@ export default function useAPI() {
     };
 }
 '''
-    create_file(project_path / "src" / "utils" / "api.ts", api_content)
+    manifest.add("src/utils/api.ts", api_content)
 
-def create_theme_provider(project_path):
+def create_theme_provider(manifest):
     """Create theme provider component"""
     theme_provider_content = '''import { createContext, useContext, useEffect, useState } from "react"
 
@@ -554,12 +1368,10 @@ export const useTheme = () => {
     return context
 }
 '''
-    create_file(project_path / "src" / "components" / "theme-provider.tsx", theme_provider_content)
+    manifest.add("src/components/theme-provider.tsx", theme_provider_content)
 
-def create_pages(project_path):
+def create_pages(manifest):
     """Create page components for React Router v7"""
-    print_info("Creating page components...")
-    
     # ErrorPage для React Router v7
     error_page_content = '''import { Link } from "react-router";
 
@@ -605,7 +1417,7 @@ export default function ErrorPage() {
 
 
 '''
-    create_file(project_path / "src" / "pages" / "ErrorPage.tsx", error_page_content)
+    manifest.add("src/pages/ErrorPage.tsx", error_page_content)
     
     # MainPage с навигацией для демонстрации
     main_page_content = '''import { Link } from "react-router";
@@ -642,7 +1454,7 @@ export default function MainPage() {
 }
 
 '''
-    create_file(project_path / "src" / "pages" / "MainPage.tsx", main_page_content)
+    manifest.add("src/pages/MainPage.tsx", main_page_content)
 
 def remove_useless_files(project_path):
     """Remove unnecessary files from the Vite template"""
@@ -678,10 +1490,8 @@ def remove_useless_files(project_path):
     print_success(f"Removed {removed_count} unnecessary files")
     return True
     
-def create_app_component(project_path, project_type):
+def create_app_component(manifest, project_type):
     """Create App.tsx based on project type with React Router v7"""
-    print_info("Creating App component for React Router v7...")
-    
     if project_type == "telegram":
         app_content = '''import { ThemeProvider } from "./components/theme-provider"
 
@@ -826,33 +1636,43 @@ function App() {
 export default App;
 '''
     
-    create_file(project_path / "src" / "App.tsx", app_content)
+    manifest.add("src/App.tsx", app_content)
 
-def create_docker_config(project_path):
+def create_docker_config(manifest, node_version=DEFAULT_NODE_VERSION):
     """Create Docker configuration files"""
-    print_info("Creating Docker configuration...")
-    
-    # Dockerfile
-    dockerfile_content = '''FROM node:18-alpine AS builder
+    # Dockerfile (BuildKit): the deps stage depends only on package.json and
+    # package-lock.json, so source-only changes reuse the installed node_modules
+    dockerfile_content = f'''# syntax=docker/dockerfile:1
+
+# Matches the Node.js version detected when the project was generated
+ARG NODE_VERSION={node_version}
+
+FROM node:${{NODE_VERSION}}-alpine AS deps
 
 WORKDIR /app
 
-COPY package*.json ./
-RUN npm ci
+COPY package.json package-lock.json ./
+RUN --mount=type=cache,target=/root/.npm \\
+    npm ci --prefer-offline --no-audit --no-fund
+
+FROM node:${{NODE_VERSION}}-alpine AS builder
 
+WORKDIR /app
+
+COPY --from=deps /app/node_modules ./node_modules
 COPY . .
 RUN npm run build
 
 FROM nginx:alpine
 
-COPY --from=builder /app/dist /usr/share/nginx/html
 COPY nginx.conf /etc/nginx/conf.d/default.conf
+COPY --from=builder /app/dist /usr/share/nginx/html
 
 EXPOSE 80
 
 CMD ["nginx", "-g", "daemon off;"]
 '''
-    create_file(project_path / "Dockerfile", dockerfile_content)
+    manifest.add("Dockerfile", dockerfile_content)
     
     # nginx.conf
     nginx_content = '''server {
@@ -861,6 +1681,18 @@ CMD ["nginx", "-g", "daemon off;"]
     root /usr/share/nginx/html;
     index index.html;
 
+    # Pre-compressed .gz siblings are generated by scripts/compress-dist.mjs on build
+    gzip_static on;
+    gzip_vary on;
+    # .br siblings (COMPRESS_BROTLI=1) need an image with the ngx_brotli module
+    # and "brotli_static on;" - nginx:alpine does not include it
+
+    # On-the-fly fallback for files without a pre-compressed sibling
+    gzip on;
+    gzip_comp_level 5;
+    gzip_min_length 1024;
+    gzip_types text/css application/javascript application/json image/svg+xml;
+
     # Serve static files
     location / {
         try_files $uri $uri/ /index.html;
@@ -881,7 +1713,7 @@ CMD ["nginx", "-g", "daemon off;"]
     # }
 }
 '''
-    create_file(project_path / "nginx.conf", nginx_content)
+    manifest.add("nginx.conf", nginx_content)
     
     # .dockerignore
     dockerignore_content = '''**/.git
@@ -889,100 +1721,633 @@ CMD ["nginx", "-g", "daemon off;"]
 **/node_modules
 **/docs
 **/build
+**/dist
 **/coverage
 **/Dockerfile
 **/docker-compose*
 **/.vscode
 **/npm-debug.log
 '''
-    create_file(project_path / ".dockerignore", dockerignore_content)
+    manifest.add(".dockerignore", dockerignore_content)
+
+def create_compression_scripts(manifest):
+    """Create build scripts that pre-compress dist/ and benchmark the result"""
+    # Runs as "postbuild", nginx serves the .gz siblings with gzip_static
+    compress_content = '''// Writes .gz siblings for compressible files in dist/ (and .br with COMPRESS_BROTLI=1).
+// nginx serves them with gzip_static instead of compressing per request; .br files
+// are only useful with an nginx image that has ngx_brotli (brotli_static on).
+import { readdir, readFile, writeFile } from 'node:fs/promises'
+import { extname, join } from 'node:path'
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib'
+
+const DIST_DIR = process.argv[2] ?? 'dist'
+const EXTENSIONS = new Set(['.js', '.mjs', '.css', '.html', '.svg', '.json', '.txt', '.xml', '.map', '.wasm'])
+const MIN_SIZE = 1024
+const BROTLI = process.env.COMPRESS_BROTLI === '1'
+
+async function* walk(dir) {
+  for (const entry of await readdir(dir, { withFileTypes: true })) {
+    const path = join(dir, entry.name)
+    if (entry.isDirectory()) yield* walk(path)
+    else yield path
+  }
+}
+
+const kb = (bytes) => `${(bytes / 1024).toFixed(1)} KiB`
+
+let files = 0
+let rawTotal = 0
+let gzipTotal = 0
+let brotliTotal = 0
+
+for await (const file of walk(DIST_DIR)) {
+  if (!EXTENSIONS.has(extname(file))) continue
+
+  const data = await readFile(file)
+  if (data.length < MIN_SIZE) continue
+
+  const gzip = gzipSync(data, { level: 9 })
+  const brotli = BROTLI
+    ? brotliCompressSync(data, {
+        params: {
+          [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+          [constants.BROTLI_PARAM_SIZE_HINT]: data.length,
+        },
+      })
+    : data
+
+  // A compressed sibling that is not smaller would only waste bytes on the wire
+  if (gzip.length < data.length) await writeFile(`${file}.gz`, gzip)
+  if (brotli.length < data.length) await writeFile(`${file}.br`, brotli)
+
+  files += 1
+  rawTotal += data.length
+  gzipTotal += Math.min(gzip.length, data.length)
+  brotliTotal += Math.min(brotli.length, data.length)
+}
+
+console.log(`Pre-compressed ${files} files: ${kb(rawTotal)} -> gzip ${kb(gzipTotal)}` +
+  (BROTLI ? `, brotli ${kb(brotliTotal)}` : ''))
+'''
+    manifest.add("scripts/compress-dist.mjs", compress_content)
+    
+    bench_content = '''// Compares bytes on the wire and CPU per request for the files in dist/:
+//   before     - no compression (previous nginx.conf)
+//   on-the-fly - nginx "gzip on" compressing every response
+//   static     - pre-compressed .gz served by gzip_static (.br only with COMPRESS_BROTLI=1
+//                and an nginx image with ngx_brotli)
+// Usage: npm run build && npm run bench:compression [-- <iterations>]
+import { readdir, readFile } from 'node:fs/promises'
+import { extname, join } from 'node:path'
+import { gzipSync } from 'node:zlib'
+
+const DIST_DIR = 'dist'
+const ITERATIONS = Number(process.argv[2] ?? 200)
+const GZIP_LEVEL = 5 // same as gzip_comp_level in nginx.conf
+const GZIP_MIN_LENGTH = 1024 // same as gzip_min_length in nginx.conf
+const EXTENSIONS = new Set(['.js', '.mjs', '.css', '.html', '.svg', '.json'])
+
+async function* walk(dir) {
+  for (const entry of await readdir(dir, { withFileTypes: true })) {
+    const path = join(dir, entry.name)
+    if (entry.isDirectory()) yield* walk(path)
+    else yield path
+  }
+}
+
+async function readOptional(path) {
+  try {
+    return await readFile(path)
+  } catch {
+    return null
+  }
+}
+
+// CPU time in microseconds per call of fn
+function cpuPerCall(fn) {
+  const start = process.cpuUsage()
+  for (let i = 0; i < ITERATIONS; i++) fn()
+  const usage = process.cpuUsage(start)
+  return (usage.user + usage.system) / ITERATIONS
+}
+
+const rows = []
+for await (const file of walk(DIST_DIR)) {
+  if (!EXTENSIONS.has(extname(file))) continue
+
+  const raw = await readFile(file)
+  const gz = await readOptional(`${file}.gz`)
+  const br = await readOptional(`${file}.br`)
+
+  const compressed = raw.length >= GZIP_MIN_LENGTH
+  rows.push({
+    file: file.slice(DIST_DIR.length + 1),
+    raw: raw.length,
+    onTheFly: compressed ? gzipSync(raw, { level: GZIP_LEVEL }).length : raw.length,
+    onTheFlyCpu: compressed ? cpuPerCall(() => gzipSync(raw, { level: GZIP_LEVEL })) : 0,
+    gzip: gz ? gz.length : raw.length,
+    brotli: br ? br.length : gz ? gz.length : raw.length,
+  })
+}
+
+if (rows.length === 0) {
+  console.error(`No assets found in ${DIST_DIR}/ - run "npm run build" first`)
+  process.exit(1)
+}
 
-def update_package_json(project_path):
+const kb = (bytes) => `${(bytes / 1024).toFixed(1)} KiB`
+const total = (key) => rows.reduce((sum, row) => sum + row[key], 0)
+
+console.table(Object.fromEntries(rows.map((row) => [row.file, {
+  'before (raw)': kb(row.raw),
+  'on-the-fly gzip': kb(row.onTheFly),
+  'CPU/req on-the-fly': `${row.onTheFlyCpu.toFixed(0)} µs`,
+  'static gzip': kb(row.gzip),
+  'static brotli': kb(row.brotli),
+}])))
+
+console.log(`Bytes per full page load (${rows.length} assets):`)
+console.log(`  before (raw):        ${kb(total('raw'))}`)
+console.log(`  on-the-fly gzip:     ${kb(total('onTheFly'))}  (${total('onTheFlyCpu').toFixed(0)} µs CPU)`)
+console.log(`  static gzip:         ${kb(total('gzip'))}  (no compression CPU)`)
+console.log(`  static brotli:       ${kb(total('brotli'))}  (no compression CPU)`)
+'''
+    manifest.add("scripts/bench-compression.mjs", bench_content)
+
+def update_package_json(manifest):
     """Update package.json scripts"""
-    print_info("Updating package.json scripts...")
+    def render_package_json():
+        with open(manifest.project_path / "package.json", 'r') as f:
+            package_json = json.load(f)
+        
+        package_json["scripts"]["build"] = "tsc && vite build"
+        package_json["scripts"]["postbuild"] = "node scripts/compress-dist.mjs"
+        package_json["scripts"]["preview"] = "vite preview --port 4173"
+        package_json["scripts"]["bench:compression"] = "node scripts/bench-compression.mjs"
+        
+        return json.dumps(package_json, indent=2)
     
-    package_json_path = project_path / "package.json"
-    with open(package_json_path, 'r') as f:
-        package_json = json.load(f)
+    manifest.add("package.json", render_package_json)
+
+def get_node_version():
+    """Return the Node.js version from the preflight probe, or DEFAULT_NODE_VERSION"""
+    try:
+        probe = probe_node()
+    except Exception:
+        probe = None
+    return probe["node_version"] if probe else DEFAULT_NODE_VERSION
+
+def build_file_manifest(project_path, project_type, node_version=None):
+    """Collect every file the scaffolder generates after the install step"""
+    if node_version is None:
+        node_version = get_node_version()
     
-    package_json["scripts"]["build"] = "tsc && vite build"
-    package_json["scripts"]["preview"] = "vite preview --port 4173"
+    manifest = FileManifest(project_path)
+    update_config_files(manifest)
+    create_css_file(manifest)
+    create_type_definitions(manifest)
+    create_utils(manifest)
+    create_theme_provider(manifest)
+    create_pages(manifest)
+    create_app_component(manifest, project_type)
+    create_docker_config(manifest, node_version)
+    create_compression_scripts(manifest)
+    update_package_json(manifest)
+    return manifest
+
+def print_manifest_status(manifest):
+    """Print the dry-run listing of the manifest"""
+    print_info(f"Files generated in {manifest.project_path}:")
+    for relative_path, state in manifest.status():
+        print(f"  {state:<10} {relative_path}")
+
+def content_hash(content):
+    import hashlib
     
-    with open(package_json_path, 'w') as f:
-        json.dump(package_json, f, indent=2)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
-def main():
-    parser = argparse.ArgumentParser(description="Create a new React project with Vite, TypeScript, and Tailwind CSS")
-    parser.add_argument("project_name", help="Name of the project")
-    parser.add_argument("project_type", choices=["telegram", "web"], help="Type of project: telegram or web")
+def build_update_manifest(project_path, project_type, template_source="embedded"):
+    """Collect every file the scaffolder owns in an existing project.
     
-    args = parser.parse_args()
+    This is the post-install manifest plus the embedded base template, minus
+    the template package.json (dependencies are handled separately).
+    """
+    manifest = FileManifest(project_path)
+    if template_source == "embedded":
+        create_vite_template(manifest)
+        del manifest.entries["package.json"]
     
-    project_name = args.project_name
-    project_type = args.project_type
+    for relative_path, producer in build_file_manifest(project_path, project_type).entries.items():
+        manifest.add(relative_path, producer)
+    return manifest
+
+def load_project_state(project_path):
+    try:
+        with open(project_path / STATE_FILE_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_project_state(project_path, project_type, template_source, file_hashes):
+    """Record what the scaffolder generated, for later --update runs"""
+    state = {
+        "project_type": project_type,
+        "template_source": template_source,
+        "template_version": VITE_TEMPLATE_VERSION,
+        "dependency_key": get_dependency_key(project_type),
+        "files": dict(sorted(file_hashes.items()))
+    }
+    manifest = FileManifest(project_path)
+    manifest.add(STATE_FILE_NAME, json.dumps(state, indent=2) + "\n")
+    manifest.write()
+
+def record_project_state(project_path, project_type, template_source):
+    """Save the hashes of the scaffolder-owned files of a freshly created project"""
+    manifest = build_update_manifest(project_path, project_type, template_source)
+    file_hashes = {
+        relative_path: content_hash(producer)
+        for relative_path, producer in manifest.entries.items()
+        if not callable(producer)
+    }
+    save_project_state(project_path, project_type, template_source, file_hashes)
+
+def update_project(project_path, project_type, timings, cache_dir=None, offline=False, force=False):
+    """Bring an existing project up to date with the current templates.
     
-    print_info(f"Creating project: {project_name} ({project_type})")
+    A file is rewritten only when its template output changed since the last
+    run. Files edited locally are reported as conflicts and kept, unless
+    force is set. npm install runs only when the dependency lists changed.
+    """
+    state = load_project_state(project_path)
+    if state is None:
+        print_warning(f"No {STATE_FILE_NAME} found - files that differ from the templates are treated as local edits")
+        state = {"template_source": "npm", "files": {}}
+    elif state.get("project_type") != project_type:
+        print_warning(f"Project type changes from {state.get('project_type')} to {project_type}")
     
-    # Check if Node.js is installed
-    if not check_node_installed():
-        print_error("Node.js is not installed. Please install Node.js first.")
-        sys.exit(1)
+    template_source = state.get("template_source", "npm")
+    recorded = state.get("files", {})
     
-    project_path = Path.cwd() / project_name
+    with timed_phase(timings, "update dependencies"):
+        if state.get("dependency_key") != get_dependency_key(project_type):
+            print_info("Dependency lists changed, reinstalling...")
+            if not check_node_installed():
+                return False
+            if not write_dependencies(project_path, project_type, only_missing=True):
+                return False
+            if not install_dependencies(project_path, project_type, cache_dir, offline, template_source,
+                                        use_seed=False):
+                return False
+        else:
+            print_info("Dependencies unchanged, skipping install")
     
-    # Check if project directory already exists
-    if project_path.exists():
-        print_error(f"Directory {project_name} already exists")
-        sys.exit(1)
+    with timed_phase(timings, "update files"):
+        manifest = build_update_manifest(project_path, project_type, template_source)
+        files_to_write = {}
+        file_hashes = {}
+        conflicts = []
+        
+        for relative_path, producer in manifest.entries.items():
+            target = project_path / relative_path
+            current = target.read_text(encoding='utf-8') if target.exists() else None
+            
+            if callable(producer):
+                # Rendered from the file on disk (package.json) - just apply the changes
+                content = producer()
+                if content != current:
+                    files_to_write[relative_path] = content
+                continue
+            
+            new_hash = content_hash(producer)
+            old_hash = recorded.get(relative_path)
+            current_hash = content_hash(current) if current is not None else None
+            file_hashes[relative_path] = new_hash
+            
+            if current_hash == new_hash or (old_hash == new_hash and current is not None):
+                # Up to date, or the template did not change (local edits are kept)
+                continue
+            if current is None or current_hash == old_hash or force:
+                files_to_write[relative_path] = producer
+            else:
+                conflicts.append(relative_path)
+                if old_hash is not None:
+                    file_hashes[relative_path] = old_hash
+                else:
+                    del file_hashes[relative_path]
+        
+        if files_to_write:
+            manifest.write_files(files_to_write)
+        save_project_state(project_path, project_type, template_source, file_hashes)
+    
+    for relative_path in files_to_write:
+        print_info(f"Updated: {relative_path}")
+    for relative_path in conflicts:
+        print_warning(f"Skipped (edited locally, use --force to overwrite): {relative_path}")
+    print_success(f"{len(files_to_write)} files updated, {len(conflicts)} conflicts")
+    return True
+
+def create_project(project_path, project_type, timings, cache_dir=None, offline=False, template_source="embedded"):
+    """Create a single project in project_path and record phase timings.
     
+    Returns True on success. On failure the last phase in timings is the one
+    that failed.
+    """
     try:
         # Create project directory
         project_path.mkdir()
         print_success("Project directory created")
         
         # Setup project
-        if not setup_vite_project(project_path):
-            sys.exit(1)
+        with timed_phase(timings, "create vite project"):
+            if not setup_vite_project(project_path, cache_dir, offline, template_source):
+                return False
         
-        if not install_dependencies(project_path, project_type):
-            sys.exit(1)
+        with timed_phase(timings, "write dependencies"):
+            if not write_dependencies(project_path, project_type):
+                return False
+        
+        with timed_phase(timings, "install dependencies"):
+            if not install_dependencies(project_path, project_type, cache_dir, offline, template_source):
+                return False
         
         if not setup_tailwind(project_path):
-            sys.exit(1)
+            return False
         
-        create_project_structure(project_path)
-        update_config_files(project_path)
-        create_css_file(project_path)
-        create_type_definitions(project_path)
-        create_utils(project_path)
-        create_theme_provider(project_path)
-        create_pages(project_path)
-        remove_useless_files(project_path)
-        create_app_component(project_path, project_type)
-        create_docker_config(project_path)
-        update_package_json(project_path)
+        with timed_phase(timings, "generate files"):
+            create_project_structure(project_path)
+            remove_useless_files(project_path)
+            manifest = build_file_manifest(project_path, project_type)
+            print_info(f"Writing {len(manifest.entries)} project files...")
+            manifest.write()
+            record_project_state(project_path, project_type, template_source)
+            print_success("Project files created")
         
-        print_success("Project setup completed!")
-        print("")
-        print(f"{Colors.GREEN}🎉 Project {project_name} ({project_type}) created successfully!{Colors.RESET}")
-        print("")
-        print(f"{Colors.YELLOW}Next steps:{Colors.RESET}")
-        print(f"1. cd {project_name}")
-        print("2. npm run dev")
-        print("")
-        print(f"{Colors.BLUE}Available scripts:{Colors.RESET}")
-        print("  npm run dev      - Start development server")
-        print("  npm run build    - Build for production")
-        print("  npm run preview  - Preview production build")
-        print("")
-        print(f"{Colors.GREEN}Happy coding! 🚀{Colors.RESET}")
+        return True
         
     except Exception as e:
         print_error(f"An error occurred: {str(e)}")
         # Clean up on error
         if project_path.exists():
             shutil.rmtree(project_path)
+        return False
+
+def parse_timeout(value):
+    """Parse a --timeout value: 'SECONDS' or 'STEP=SECONDS'"""
+    step, separator, seconds = value.rpartition("=")
+    if not separator:
+        step = "default"
+    try:
+        seconds = float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid timeout: {value}")
+    if step not in STEP_TIMEOUTS or seconds <= 0:
+        raise argparse.ArgumentTypeError(f"invalid timeout: {value} (steps: {', '.join(STEP_TIMEOUTS)})")
+    return step, seconds
+
+def load_batch_spec(spec_path):
+    """Load the list of projects from a JSON or YAML batch spec.
+    
+    The spec is either a list of projects or a mapping with optional
+    "defaults" and a "projects" list. Each project needs "name" and "type".
+    """
+    with open(spec_path, 'r', encoding='utf-8') as f:
+        if spec_path.suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is required for YAML batch specs (pip install pyyaml)")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    
+    if isinstance(spec, list):
+        spec = {"projects": spec}
+    if not isinstance(spec, dict):
+        raise ValueError(f"{spec_path} must contain a list of projects or a mapping with \"projects\"")
+    
+    defaults = spec.get("defaults") or {}
+    if not isinstance(defaults, dict):
+        raise ValueError(f"\"defaults\" in {spec_path} must be a mapping")
+    entries = spec.get("projects") or []
+    if not isinstance(entries, list):
+        raise ValueError(f"\"projects\" in {spec_path} must be a list")
+    
+    projects = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError(f"Project entry in {spec_path} must be a mapping: {entry!r}")
+        project = {**defaults, **entry}
+        if not project.get("name"):
+            raise ValueError(f"Project without a name in {spec_path}: {entry}")
+        if project.get("type") not in ("telegram", "web"):
+            raise ValueError(f"Project {project['name']}: type must be 'telegram' or 'web'")
+        projects.append(project)
+    
+    names = [project["name"] for project in projects]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate project names in {spec_path}: {', '.join(duplicates)}")
+    
+    return projects
+
+def run_batch_project(project, base_dir, cache_dir, offline, template_source):
+    """Create one project of a batch (runs in a worker process)"""
+    project_path = base_dir / project["name"]
+    timings = {}
+    
+    if project_path.exists():
+        return {**project, "ok": False, "timings": timings, "error": "directory already exists"}
+    
+    start = time.perf_counter()
+    ok = create_project(project_path, project["type"], timings, cache_dir, offline, template_source)
+    total = time.perf_counter() - start
+    
+    error = None
+    if not ok:
+        error = f"failed at: {list(timings)[-1]}" if timings else "failed"
+    return {**project, "ok": ok, "timings": timings, "total": total, "error": error}
+
+def print_batch_summary(results):
+    """Print per-project timings and failures of a batch run"""
+    name_width = max([len("project")] + [len(result["name"]) for result in results])
+    
+    print(f"{Colors.BLUE}Batch summary:{Colors.RESET}")
+    print(f"  {'project'.ljust(name_width)}  {'type':<8}  {'install':>8}  {'total':>8}  status")
+    for result in results:
+        install = result["timings"].get("install dependencies")
+        install = f"{install:7.2f}s" if install is not None else "-"
+        total = f"{result['total']:7.2f}s" if "total" in result else "-"
+        status = f"{Colors.GREEN}ok{Colors.RESET}" if result["ok"] else f"{Colors.RED}{result['error']}{Colors.RESET}"
+        print(f"  {result['name'].ljust(name_width)}  {result['type']:<8}  {install:>8}  {total:>8}  {status}")
+    
+    failed = sum(1 for result in results if not result["ok"])
+    print(f"  {len(results) - failed} succeeded, {failed} failed")
+
+def run_batch(spec_path, jobs, cache_dir, offline, template_source, timeouts=None, log_path=None):
+    """Create every project of a batch spec with a bounded process pool.
+    
+    All projects share one npm cache and lockfile seed directory. The first
+    project of each type that has no lockfile seed yet runs before the others
+    of that type, so the seed is resolved once and then reused.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    projects = load_batch_spec(spec_path)
+    base_dir = Path.cwd()
+    
+    seeding, rest = [], []
+    seeded_types = set()
+    for project in projects:
+        project_type = project["type"]
+        seed_dir = get_lockfile_seed_dir(cache_dir, project_type, template_source)
+        if project_type not in seeded_types and not (seed_dir / "package-lock.json").exists():
+            seeded_types.add(project_type)
+            seeding.append(project)
+        else:
+            rest.append(project)
+    
+    print_info(f"Creating {len(projects)} projects with {jobs} workers (cache: {cache_dir})")
+    
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=configure_command_runner,
+                             initargs=(timeouts, log_path)) as executor:
+        for group in (seeding, rest):
+            futures = {
+                executor.submit(run_batch_project, project, base_dir, cache_dir, offline, template_source): project
+                for project in group
+            }
+            for future in as_completed(futures):
+                project = futures[future]
+                try:
+                    results[project["name"]] = future.result()
+                except Exception as e:
+                    results[project["name"]] = {**project, "ok": False, "timings": {}, "error": str(e)}
+    
+    ordered = [results[project["name"]] for project in projects]
+    print("")
+    print_batch_summary(ordered)
+    return all(result["ok"] for result in ordered)
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a new React project with Vite, TypeScript, and Tailwind CSS")
+    parser.add_argument("project_name", nargs="?", help="Name of the project")
+    parser.add_argument("project_type", nargs="?", choices=["telegram", "web"], help="Type of project: telegram or web")
+    parser.add_argument("--cache-dir", nargs="?", type=Path, const=DEFAULT_CACHE_DIR, default=None,
+                        help=f"Use a local npm cache and lockfile seeds (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--offline", action="store_true",
+                        help="Install only from the local cache (requires a seeded --cache-dir)")
+    parser.add_argument("--template-source", choices=["embedded", "npm"], default="embedded",
+                        help="Base Vite template: embedded snapshot (default) or 'npm create vite@latest'")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="List the generated files and their state without writing anything")
+    parser.add_argument("--diff", action="store_true",
+                        help="With --dry-run, show a unified diff against the existing project")
+    parser.add_argument("--batch", type=Path, metavar="SPEC",
+                        help="Create every project listed in a JSON or YAML spec file")
+    parser.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Number of projects created in parallel in --batch mode")
+    parser.add_argument("--timeout", type=parse_timeout, action="append", default=[], metavar="[STEP=]SECONDS",
+                        help=f"Command timeout, optionally per step ({', '.join(STEP_TIMEOUTS)}); can be repeated")
+    parser.add_argument("--command-log", type=Path, metavar="PATH",
+                        help="Append wall time, peak RSS and exit status of every command to a JSON lines file")
+    parser.add_argument("--update", action="store_true",
+                        help="Update an existing project: rewrite changed template files, reinstall only if dependencies changed")
+    parser.add_argument("--force", action="store_true",
+                        help="With --update, also overwrite files that were edited locally")
+    parser.add_argument("--time-startup", action="store_true",
+                        help="Print a breakdown of the script's cold-start cost and exit")
+    
+    parse_start = time.perf_counter()
+    args = parser.parse_args()
+    parse_seconds = time.perf_counter() - parse_start
+    
+    if args.time_startup:
+        report_startup_time(parse_seconds)
+        return
+    
+    if args.batch is None and (args.project_name is None or args.project_type is None):
+        parser.error("project_name and project_type are required unless --batch is used")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    
+    project_name = args.project_name
+    project_type = args.project_type
+    cache_dir = args.cache_dir
+    
+    # Batch runs always share one cache so dependencies are resolved once per type
+    if cache_dir is None and (args.offline or args.batch is not None):
+        cache_dir = DEFAULT_CACHE_DIR
+    if cache_dir is not None:
+        cache_dir = cache_dir.expanduser().resolve()
+    
+    timeouts = dict(args.timeout)
+    log_path = args.command_log.expanduser().resolve() if args.command_log else None
+    configure_command_runner(timeouts, log_path)
+    
+    if args.batch is None:
+        project_path = Path.cwd() / project_name
+    
+    if args.dry_run and args.batch is None:
+        manifest = build_file_manifest(project_path, project_type)
+        print_manifest_status(manifest)
+        if args.diff:
+            print(manifest.diff(), end="")
+        return
+    
+    timings = {}
+    
+    if args.update and args.batch is None:
+        if not project_path.is_dir():
+            print_error(f"Directory {project_name} does not exist")
+            sys.exit(1)
+        
+        print_info(f"Updating project: {project_name} ({project_type})")
+        if not update_project(project_path, project_type, timings, cache_dir, args.offline, args.force):
+            sys.exit(1)
+        print_timings(timings)
+        return
+    
+    # Check if Node.js is installed
+    with timed_phase(timings, "check node"):
+        node_installed = check_node_installed()
+    if not node_installed:
+        print_error("Node.js is not installed. Please install Node.js first.")
+        sys.exit(1)
+    
+    if args.batch is not None:
+        try:
+            ok = run_batch(args.batch, args.jobs, cache_dir, args.offline, args.template_source, timeouts, log_path)
+        except (OSError, ValueError) as e:
+            print_error(f"Invalid batch spec: {str(e)}")
+            sys.exit(1)
+        sys.exit(0 if ok else 1)
+    
+    print_info(f"Creating project: {project_name} ({project_type})")
+    
+    # Check if project directory already exists
+    if project_path.exists():
+        print_error(f"Directory {project_name} already exists (use --update to update it)")
         sys.exit(1)
+    
+    if not create_project(project_path, project_type, timings, cache_dir, args.offline, args.template_source):
+        sys.exit(1)
+    
+    print_success("Project setup completed!")
+    print("")
+    print_timings(timings)
+    print("")
+    print(f"{Colors.GREEN}🎉 Project {project_name} ({project_type}) created successfully!{Colors.RESET}")
+    print("")
+    print(f"{Colors.YELLOW}Next steps:{Colors.RESET}")
+    print(f"1. cd {project_name}")
+    print("2. npm run dev")
+    print("")
+    print(f"{Colors.BLUE}Available scripts:{Colors.RESET}")
+    print("  npm run dev      - Start development server")
+    print("  npm run build    - Build for production")
+    print("  npm run preview  - Preview production build")
+    print("")
+    print(f"{Colors.GREEN}Happy coding! 🚀{Colors.RESET}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
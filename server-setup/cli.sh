@@ -3,6 +3,8 @@
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 source "$SCRIPT_DIR/lib/helpers.sh"
 source "$SCRIPT_DIR/lib/config.sh"
+source "$SCRIPT_DIR/lib/scheduler.sh"
+source "$SCRIPT_DIR/lib/fleet.sh"
 
 show_help() {
     echo "Использование: $0 [команда]"
@@ -15,17 +17,29 @@ show_help() {
     echo "  setup-docker        Настройка Docker"
     echo "  setup-nginx         Настройка Nginx"
     echo "  setup-ssl           Настройка SSL"
+    echo "  check-ssl           Проверка SSL и времени рукопожатия"
     echo "  setup-ssh           Настройка SSH и Git"
     echo "  setup-repo          Настройка репозитория"
     echo "  setup-env           Настройка переменных окружения"
     echo "  deploy              Деплой приложения"
-    echo "  rollback            Откат деплоя"
+    echo "  rollback [release]  Откат к релизу (по умолчанию - предыдущему)"
+    echo "  releases            История релизов"
     echo "  logs [service]      Просмотр логов"
+    echo "  cache-stats [домен] [N]  Доля попаданий в кеш (по последним N строкам лога)"
     echo "  health-check        Проверка здоровья приложения"
-    echo "  full-setup          Полная настройка сервера"
+    echo "    --bench [-n N] [-c C] [-o FILE]  Замер задержек p50/p95/p99 эндпоинтов"
+    echo "  full-setup          Полная настройка сервера (модули без изменений пропускаются)"
+    echo "    --from MODULE     Выполнить заново модуль и все следующие (например, --from 06)"
+    echo "    --force MODULE    Выполнить заново модуль, можно указать несколько раз"
     echo "  status              Показать статус"
+    echo "  fleet [-j N] INVENTORY COMMAND [args]"
+    echo "                      Выполнить команду на серверах из инвентаря по SSH"
     echo "  help                Показать эту справку"
     echo ""
+    echo "Параметры:"
+    echo "  --non-interactive   Не задавать вопросов: ответы берутся из $CONFIG_FILE,"
+    echo "                      отсутствующее значение - ошибка"
+    echo ""
 }
 
 setup_config() {
@@ -35,6 +49,7 @@ setup_config() {
     input_with_check "Введите домен бэкенда" "BACKEND_DOMAIN" "$BACKEND_DOMAIN"
     input_with_check "Введите email для SSL" "USER_EMAIL" "$USER_EMAIL"
     input_with_check "Введите SSH URL репозитория" "REPO_URL" "$REPO_URL"
+    input_with_check "Стратегия деплоя (recreate/blue-green)" "DEPLOY_STRATEGY" "$DEPLOY_STRATEGY"
     
     save_config
     print_success "Конфигурация сохранена"
@@ -56,6 +71,11 @@ run_module() {
 full_setup() {
     print_step "ПОЛНАЯ НАСТРОЙКА СЕРВЕРА"
     
+    if ! parse_checkpoint_options "$@"; then
+        show_help
+        exit 1
+    fi
+    
     # Загрузка конфигурации
     if ! load_config; then
         print_warning "Конфигурация не найдена. Запустите настройку конфигурации."
@@ -68,17 +88,25 @@ full_setup() {
         exit 1
     fi
     
-    # Последовательный запуск модулей
-    run_module "01_system_update.sh" && system_update
-    run_module "02_packages.sh" && install_packages
-    run_module "03_firewall.sh" && setup_firewall
-    run_module "04_docker.sh" && setup_docker
-    run_module "05_nginx_setup.sh" && setup_nginx
-    run_module "06_ssl.sh" && setup_ssl
-    run_module "07_ssh_git.sh" && setup_ssh_git
-    run_module "08_repo_setup.sh" && setup_repository
-    run_module "08_repo_setup.sh" && setup_env_file
-    run_module "09_deploy.sh" && deploy_app
+    if [ "$NON_INTERACTIVE" = "yes" ]; then
+        print_info "Неинтерактивный режим: ответы берутся из $CONFIG_FILE"
+        check_non_interactive_config || exit 1
+    fi
+    
+    # Запуск модулей: независимые выполняются параллельно (зависимости - в заголовках модулей)
+    if ! schedule_modules \
+        "01_system_update.sh:system_update" \
+        "02_packages.sh:install_packages" \
+        "03_firewall.sh:setup_firewall" \
+        "04_docker.sh:setup_docker" \
+        "05_nginx_setup.sh:setup_nginx" \
+        "06_ssl.sh:setup_ssl" \
+        "07_ssh_git.sh:setup_ssh_git" \
+        "08_repo_setup.sh:setup_repository,setup_env_file" \
+        "09_deploy.sh:deploy_app"; then
+        print_error "Полная настройка завершена с ошибками, подробности в логах модулей"
+        exit 1
+    fi
     
     print_success "Полная настройка завершена!"
     print_divider
@@ -88,6 +116,26 @@ full_setup() {
     print_divider
 }
 
+fleet_command() {
+    local parallel
+    
+    load_config
+    parallel="${FLEET_PARALLEL:-4}"
+    
+    if [ "$1" = "-j" ]; then
+        parallel="$2"
+        shift 2
+    fi
+    
+    if ! [[ "$parallel" =~ ^[1-9][0-9]*$ ]]; then
+        print_error "Число серверов одновременно должно быть положительным: $parallel"
+        exit 1
+    fi
+    
+    print_step "FLEET: $*"
+    run_fleet "$1" "$parallel" "${@:2}" || exit 1
+}
+
 show_status() {
     print_step "СТАТУС СИСТЕМЫ"
     
@@ -108,6 +156,17 @@ show_status() {
     docker ps --format "table {{.Names}}\t{{.Status}}\t{{.Ports}}"
 }
 
+# --non-interactive допускается в любом месте командной строки
+args=()
+for arg in "$@"; do
+    if [ "$arg" = "--non-interactive" ]; then
+        NON_INTERACTIVE="yes"
+    else
+        args+=("$arg")
+    fi
+done
+set -- "${args[@]}"
+
 # Основная логика
 case "${1:-help}" in
     "config")
@@ -131,6 +190,9 @@ case "${1:-help}" in
     "setup-ssl")
         run_module "06_ssl.sh" && setup_ssl
         ;;
+    "check-ssl")
+        run_module "06_ssl.sh" && check_ssl
+        ;;
     "setup-ssh")
         run_module "07_ssh_git.sh" && setup_ssh_git
         ;;
@@ -144,20 +206,33 @@ case "${1:-help}" in
         run_module "09_deploy.sh" && deploy_app
         ;;
     "rollback")
-        run_module "09_deploy.sh" && rollback_deploy
+        run_module "09_deploy.sh" && rollback_deploy "$2"
+        ;;
+    "releases")
+        run_module "09_deploy.sh" && show_releases
         ;;
     "logs")
         run_module "09_deploy.sh" && show_logs "$2"
         ;;
+    "cache-stats")
+        run_module "05_nginx_setup.sh" && show_cache_stats "${@:2}"
+        ;;
     "health-check")
-        run_module "09_deploy.sh" && check_application_health
+        if [ "$2" = "--bench" ]; then
+            run_module "09_deploy.sh" && bench_application_health "${@:3}"
+        else
+            run_module "09_deploy.sh" && check_application_health
+        fi
         ;;
     "full-setup")
-        full_setup
+        full_setup "${@:2}"
         ;;
     "status")
         show_status
         ;;
+    "fleet")
+        fleet_command "${@:2}"
+        ;;
         # В секции case добавьте:
     "view-maintenance")
     run_module "05_nginx_setup.sh" && view_maintenance_page
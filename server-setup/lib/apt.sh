@@ -0,0 +1,89 @@
+#!/bin/bash
+
+source "$(dirname "${BASH_SOURCE[0]}")/colors.sh"
+
+# Установка пакетов через apt.
+# APT_MODE=single - обновление системы и установка пакетов одной транзакцией
+# (одно разрешение зависимостей, одна загрузка, один проход dpkg) без рекомендуемых пакетов.
+# APT_PROXY  - кеширующий прокси (apt-cacher-ng): пакеты скачиваются с зеркал один раз на весь парк
+# APT_DEB_DIR - архив .deb: перед установкой копируется в кеш apt, после - пополняется скачанными
+
+APT_PACKAGES="nginx certbot python3-certbot-nginx git docker.io docker-compose ufw"
+APT_SETTINGS_FILE="/etc/apt/apt.conf.d/90server-setup"
+
+# Прокси, параллельная загрузка и повторы. Без прокси хватает Queue-Mode по умолчанию
+# (host - по соединению на зеркало), с прокси все запросы идут на один хост,
+# и access открывает отдельное соединение на каждый источник
+write_apt_settings() {
+    {
+        echo "Acquire::Retries \"3\";"
+        if [ -n "$APT_PROXY" ]; then
+            echo "Acquire::Queue-Mode \"access\";"
+            echo "Acquire::http::Proxy \"$APT_PROXY\";"
+            # HTTPS-зеркала прокси не кеширует, к ним напрямую
+            echo "Acquire::https::Proxy \"DIRECT\";"
+        fi
+    } > "$APT_SETTINGS_FILE"
+}
+
+# Пакеты из архива в кеш apt: совпадающие по версии не скачиваются
+seed_apt_cache() {
+    if [ -z "$APT_DEB_DIR" ] || ! ls "$APT_DEB_DIR"/*.deb > /dev/null 2>&1; then
+        return 0
+    fi
+
+    print_info "Копирование пакетов из $APT_DEB_DIR в кеш apt..."
+    cp -n "$APT_DEB_DIR"/*.deb /var/cache/apt/archives/
+}
+
+# Скачанные пакеты в архив для следующих серверов
+harvest_apt_cache() {
+    if [ -z "$APT_DEB_DIR" ]; then
+        return 0
+    fi
+
+    mkdir -p "$APT_DEB_DIR"
+    cp -n /var/cache/apt/archives/*.deb "$APT_DEB_DIR"/ 2>/dev/null
+    print_info "Пакетов в архиве $APT_DEB_DIR: $(ls "$APT_DEB_DIR"/*.deb 2>/dev/null | wc -l)"
+}
+
+apt_update() {
+    local status
+
+    write_apt_settings
+    seed_apt_cache
+
+    apt update
+    status=$?
+
+    if [ "$status" -ne 0 ] && [ -n "$APT_DEB_DIR" ]; then
+        print_warning "Не удалось обновить списки пакетов, используются сохраненные и архив $APT_DEB_DIR"
+        return 0
+    fi
+
+    return "$status"
+}
+
+# Обновление и установка одной транзакцией: dist-upgrade с именами пакетов
+# (apt >= 1.1) обновляет систему и ставит новые пакеты за одно разрешение зависимостей.
+# В отличие от apt upgrade, dist-upgrade может ставить новые зависимости и удалять пакеты
+apt_single_transaction() {
+    local status
+
+    DEBIAN_FRONTEND=noninteractive apt-get dist-upgrade -y --no-install-recommends \
+        -o Dpkg::Options::=--force-confdef -o Dpkg::Options::=--force-confold \
+        $APT_PACKAGES
+    status=$?
+
+    harvest_apt_cache
+    return $status
+}
+
+# Все ли пакеты APT_PACKAGES установлены
+apt_packages_installed() {
+    local package
+
+    for package in $APT_PACKAGES; do
+        dpkg-query -W -f='${Status}' "$package" 2>/dev/null | grep -q "install ok installed" || return 1
+    done
+}
\ No newline at end of file
@@ -0,0 +1,105 @@
+#!/bin/bash
+
+source "$(dirname "${BASH_SOURCE[0]}")/colors.sh"
+
+# Нагрузочная проверка эндпоинтов: задержки p50/p95/p99, доля ошибок, время TLS
+
+# N запросов к одному эндпоинту с параллельностью C.
+# Каждая строка результата: "код time_total time_connect time_appconnect"
+bench_endpoint() {
+    local url="$1"
+    local requests="$2"
+    local concurrency="$3"
+    local out="$4"
+
+    seq "$requests" | xargs -P "$concurrency" -I{} \
+        curl -s -o /dev/null --max-time 10 \
+        -w '%{http_code} %{time_total} %{time_connect} %{time_appconnect}\n' \
+        "$url" > "$out"
+}
+
+# Сводка по результатам одного эндпоинта:
+# "запросы ошибки доля_ошибок p50 p95 p99 tls" (мс, tls "null" для http)
+bench_summary() {
+    local results="$1"
+
+    sort -g -k2 "$results" | awk '
+        function pct(p,    idx) {
+            idx = int((p * n + 99) / 100)
+            if (idx < 1) idx = 1
+            return t[idx] * 1000
+        }
+        {
+            n++
+            t[n] = $2
+            if ($1 == "000" || $1 >= 400) errors++
+            if ($4 > 0) { tls += $4 - $3; tls_n++ }
+        }
+        END {
+            if (n == 0) {
+                print "0 0 0 null null null null"
+                exit
+            }
+            printf "%d %d %.4f %.1f %.1f %.1f ", n, errors, errors / n, pct(50), pct(95), pct(99)
+            if (tls_n > 0) printf "%.1f\n", tls / tls_n * 1000
+            else print "null"
+        }
+    '
+}
+
+# Параллельный замер всех эндпоинтов, таблица в консоль и JSON в файл
+run_bench() {
+    local requests="$1"
+    local concurrency="$2"
+    local output="$3"
+    shift 3
+    local endpoints=("$@")
+    local tmp_dir
+    local i
+    local summaries=()
+    local count errors rate p50 p95 p99 tls
+
+    tmp_dir=$(mktemp -d)
+
+    print_info "Замер ${#endpoints[@]} эндпоинтов: $requests запросов, параллельность $concurrency..."
+
+    for i in "${!endpoints[@]}"; do
+        bench_endpoint "${endpoints[$i]}" "$requests" "$concurrency" "$tmp_dir/$i" &
+    done
+    wait
+
+    for i in "${!endpoints[@]}"; do
+        summaries+=("$(bench_summary "$tmp_dir/$i")")
+    done
+    rm -rf "$tmp_dir"
+
+    printf "  %-40s %9s %9s %9s %8s %9s\n" "URL" "p50, мс" "p95, мс" "p99, мс" "ошибки" "TLS, мс"
+    for i in "${!endpoints[@]}"; do
+        read -r count errors rate p50 p95 p99 tls <<< "${summaries[$i]}"
+        printf "  %-40s %9s %9s %9s %8s %9s\n" "${endpoints[$i]}" "$p50" "$p95" "$p99" "$errors/$count" "${tls/null/-}"
+    done
+
+    mkdir -p "$(dirname "$output")"
+    {
+        echo "{"
+        echo "  \"timestamp\": \"$(date -u +%Y-%m-%dT%H:%M:%SZ)\","
+        echo "  \"sha\": \"$(git -C "$PROJECT_DIR" rev-parse --short HEAD 2>/dev/null)\","
+        echo "  \"requests\": $requests,"
+        echo "  \"concurrency\": $concurrency,"
+        echo "  \"endpoints\": ["
+        for i in "${!endpoints[@]}"; do
+            read -r count errors rate p50 p95 p99 tls <<< "${summaries[$i]}"
+            printf '    {"url": "%s", "requests": %s, "errors": %s, "error_rate": %s, "p50_ms": %s, "p95_ms": %s, "p99_ms": %s, "tls_handshake_ms": %s}' \
+                "${endpoints[$i]}" "$count" "$errors" "$rate" "$p50" "$p95" "$p99" "$tls"
+            if [ "$i" -lt $((${#endpoints[@]} - 1)) ]; then
+                echo ","
+            else
+                echo ""
+            fi
+        done
+        echo "  ]"
+        echo "}"
+    } > "$output"
+
+    print_success "Результаты сохранены в $output"
+}
\ No newline at end of file
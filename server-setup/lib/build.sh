@@ -0,0 +1,167 @@
+#!/bin/bash
+
+source "$(dirname "${BASH_SOURCE[0]}")/colors.sh"
+
+# Сборка Docker образов с кешем слоев.
+# Функции вызываются из директории проекта (PROJECT_DIR).
+
+# Файл с SHA последнего успешного деплоя (для blue/green - свой на каждый цвет)
+deployed_sha_file() {
+    local color="$1"
+    echo "$STATE_DIR/deployed_sha${color:+_$color}"
+}
+
+# Запоминаем текущий коммит как задеплоенный
+record_deployed_sha() {
+    local color="$1"
+
+    mkdir -p "$STATE_DIR"
+    git rev-parse HEAD > "$(deployed_sha_file "$color")"
+}
+
+# Имя compose-проекта так, как его нормализует docker-compose
+compose_project_name() {
+    local color="$1"
+    local name
+
+    name="$(basename "$PROJECT_DIR")${color:+-$color}"
+    echo "$name" | tr 'A-Z' 'a-z' | tr -cd 'a-z0-9_-'
+}
+
+# Сервисы со сборкой: "сервис контекст образ" (образ "-", если не задан)
+service_build_contexts() {
+    docker-compose config 2>/dev/null | awk '
+        /^services:/ { in_services = 1; next }
+        /^[^ ]/ { in_services = 0 }
+        !in_services { next }
+        /^  [^ ].*:$/ {
+            flush()
+            service = $1; sub(/:$/, "", service)
+            context = ""; image = "-"
+            next
+        }
+        /^    image: / { image = $2 }
+        /^      context: / { context = $2 }
+        function flush() {
+            if (service != "" && context != "") print service, context, image
+        }
+        END { flush() }
+    '
+}
+
+# Сервисы, контекст сборки которых изменился с последнего деплоя.
+# Пустой вывод - пересобирать нечего, "all" - нужна полная сборка
+changed_services() {
+    local color="$1"
+    local last_sha
+    local changed
+    local service context image rel
+
+    last_sha=$(cat "$(deployed_sha_file "$color")" 2>/dev/null)
+
+    if [ -z "$last_sha" ] || ! git cat-file -e "${last_sha}^{commit}" 2>/dev/null; then
+        echo "all"
+        return
+    fi
+
+    changed=$(git diff --name-only "$last_sha" HEAD)
+
+    if [ -z "$changed" ]; then
+        return
+    fi
+
+    # Изменение compose-файла может затронуть любой сервис
+    if echo "$changed" | grep -qE '^docker-compose\.ya?ml$'; then
+        echo "all"
+        return
+    fi
+
+    while read -r service context image; do
+        # Контекст вне репозитория не отслеживается через git - собираем всегда
+        if [ "${context#"$PROJECT_DIR"}" = "$context" ]; then
+            echo "$service"
+            continue
+        fi
+
+        rel="${context#"$PROJECT_DIR"}"
+        rel="${rel#/}"
+
+        if [ -z "$rel" ] || echo "$changed" | awk -v prefix="$rel/" 'index($0, prefix) == 1 { found = 1 } END { exit !found }'; then
+            echo "$service"
+        fi
+    done < <(service_build_contexts)
+}
+
+# Сборка через buildx bake с постоянным локальным кешем BuildKit
+bake_with_cache() {
+    local color="$1"
+    shift
+    local services=("$@")
+    local project
+    local args=()
+    local service context image
+
+    project=$(compose_project_name "$color")
+
+    while read -r service context image; do
+        if [ "${#services[@]}" -gt 0 ] && [[ ! " ${services[*]} " =~ " $service " ]]; then
+            continue
+        fi
+
+        if [ "$image" = "-" ]; then
+            image="${project}_${service}"
+        fi
+
+        mkdir -p "$BUILD_CACHE_DIR/$service"
+        args+=(--set "$service.tags=$image")
+        args+=(--set "$service.cache-from=type=local,src=$BUILD_CACHE_DIR/$service")
+        args+=(--set "$service.cache-to=type=local,dest=$BUILD_CACHE_DIR/$service,mode=max")
+    done < <(service_build_contexts)
+
+    docker buildx bake -f "$(ls docker-compose.y*ml | head -n 1)" --load "${args[@]}" "${services[@]}"
+}
+
+# Сборка образов стека: clean - без кеша, incremental - только измененные сервисы
+build_images() {
+    local color="$1"
+    local compose_args=()
+    local services=()
+
+    if [ -n "$color" ]; then
+        compose_args=(-p "$(compose_project_name "$color")")
+    fi
+
+    export DOCKER_BUILDKIT=1
+    export COMPOSE_DOCKER_CLI_BUILD=1
+
+    if [ "$BUILD_MODE" = "clean" ]; then
+        print_info "Полная сборка без кеша..."
+        docker-compose "${compose_args[@]}" build --no-cache
+        return $?
+    fi
+
+    local changed
+    changed=$(changed_services "$color")
+
+    if [ -z "$changed" ]; then
+        print_info "Контексты сборки не изменились с последнего деплоя, сборка пропущена"
+        return 0
+    fi
+
+    if [ "$changed" != "all" ]; then
+        read -r -a services <<< "$(echo $changed)"
+        print_info "Пересборка измененных сервисов: ${services[*]}"
+    else
+        print_info "Сборка всех сервисов с кешем слоев..."
+    fi
+
+    if [ -n "$BUILD_CACHE_DIR" ]; then
+        if docker buildx version > /dev/null 2>&1; then
+            bake_with_cache "$color" "${services[@]}"
+            return $?
+        fi
+        print_warning "docker buildx не найден, кеш $BUILD_CACHE_DIR не используется"
+    fi
+
+    docker-compose "${compose_args[@]}" build "${services[@]}"
+}
\ No newline at end of file
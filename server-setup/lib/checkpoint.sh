@@ -0,0 +1,152 @@
+#!/bin/bash
+
+source "$(dirname "${BASH_SOURCE[0]}")/colors.sh"
+
+# Контрольные точки full-setup: модуль, завершившийся успешно, записывается
+# в файл состояния вместе с хешем своих входных данных. При повторном запуске
+# модуль с тем же хешем пропускается.
+# Хеш входных данных: файл модуля, подключаемые им lib/*.sh, вызываемые функции
+# и значения параметров конфигурации из заголовка модуля:
+#   # inputs: DOMAIN SITES NGINX_*   - только эти параметры
+#   # inputs: none                   - параметры не влияют на модуль
+#   (без заголовка)                  - вся конфигурация
+#   # checkpoint: no                 - модуль выполняется всегда
+
+CHECKPOINT_FORCE=""             # модули, которые нужно выполнить заново (--force)
+CHECKPOINT_FROM=""              # выполнить заново этот модуль и все после него (--from)
+
+checkpoint_file() {
+    echo "$STATE_DIR/modules.state"
+}
+
+# 06 / 06_ssl / 06_ssl.sh -> 06_ssl.sh
+checkpoint_module_name() {
+    local name="$1"
+    local found
+
+    found=$(ls -1 "$SCRIPT_DIR/modules" | grep -E "^${name%.sh}(_|\.sh$)" | head -n 1)
+
+    if [ -z "$found" ]; then
+        print_error "Модуль $name не найден" >&2
+        return 1
+    fi
+
+    echo "$found"
+}
+
+# Файлы lib/*.sh, которые модуль подключает (в том числе через другие lib)
+module_sources() {
+    local module="$1"
+    local queue=("$SCRIPT_DIR/modules/$module")
+    local seen=" "
+    local file lib
+
+    while [ "${#queue[@]}" -gt 0 ]; do
+        file="${queue[0]}"
+        queue=("${queue[@]:1}")
+
+        for lib in $(grep -o 'lib/[a-z_]*\.sh\|/[a-z_]*\.sh"' "$file" | sed 's|.*/||; s|"$||'); do
+            [[ "$seen" == *" $lib "* ]] && continue
+            seen="$seen$lib "
+            queue+=("$SCRIPT_DIR/lib/$lib")
+        done
+    done
+
+    echo "$SCRIPT_DIR/modules/$module"
+    for lib in $seen; do
+        [ -f "$SCRIPT_DIR/lib/$lib" ] && echo "$SCRIPT_DIR/lib/$lib"
+    done
+}
+
+# Строки конфигурации, от которых зависит модуль
+module_config_inputs() {
+    local module="$1"
+    local inputs
+    local patterns
+    local pattern
+
+    if ! grep -q "^# inputs:" "$SCRIPT_DIR/modules/$module"; then
+        cat "$CONFIG_FILE" 2>/dev/null
+        return
+    fi
+
+    inputs=$(module_header "$module" inputs)
+    [ "$inputs" = "none" ] && return
+
+    read -ra patterns <<< "$inputs"
+    for pattern in "${patterns[@]}"; do
+        grep "^${pattern//\*/[A-Z0-9_]*}=" "$CONFIG_FILE" 2>/dev/null
+    done
+}
+
+module_input_hash() {
+    local module="$1"
+    local functions="$2"
+
+    {
+        echo "$functions"
+        module_sources "$module" | xargs cat
+        module_config_inputs "$module"
+    } | sha256sum | cut -d ' ' -f 1
+}
+
+# Хеш последнего успешного выполнения модуля
+checkpoint_hash() {
+    local module="$1"
+
+    awk -v m="$module" '$1 == m { print $2 }' "$(checkpoint_file)" 2>/dev/null
+}
+
+checkpoint_save() {
+    local module="$1"
+    local hash="$2"
+    local file
+
+    file=$(checkpoint_file)
+    mkdir -p "$(dirname "$file")"
+
+    {
+        awk -v m="$module" '$1 != m' "$file" 2>/dev/null
+        echo "$module $hash $(date +%s)"
+    } > "$file.tmp" && mv -f "$file.tmp" "$file"
+}
+
+checkpoint_clear() {
+    local module="$1"
+    local file
+
+    file=$(checkpoint_file)
+    [ -f "$file" ] || return 0
+
+    awk -v m="$module" '$1 != m' "$file" > "$file.tmp" && mv -f "$file.tmp" "$file"
+}
+
+# Модуль указан в --force
+checkpoint_forced() {
+    local module="$1"
+
+    [[ " $CHECKPOINT_FORCE " == *" $module "* ]]
+}
+
+# Разбор --from/--force для full-setup
+parse_checkpoint_options() {
+    local module
+
+    while [ $# -gt 0 ]; do
+        case "$1" in
+            --from)
+                CHECKPOINT_FROM=$(checkpoint_module_name "$2") || return 1
+                shift 2
+                ;;
+            --force)
+                module=$(checkpoint_module_name "$2") || return 1
+                CHECKPOINT_FORCE="$CHECKPOINT_FORCE $module"
+                shift 2
+                ;;
+            *)
+                print_error "Неизвестный параметр: $1"
+                return 1
+                ;;
+        esac
+    done
+}
\ No newline at end of file
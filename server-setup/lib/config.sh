@@ -7,6 +7,86 @@ BACKEND_DOMAIN=""
 REPO_URL=""
 USER_EMAIL=""
 
+# Дополнительные сайты, по одному на строку:
+# домен port=8081 [static=/var/www/app] [alias=/static/=/path] [cache=5m]
+SITES=""
+
+# apt
+APT_MODE="single"               # single - обновление и установка одной транзакцией | separate
+APT_PROXY=""                    # кеширующий прокси, например http://10.0.0.5:3142 (apt-cacher-ng)
+APT_DEB_DIR=""                  # архив .deb: используется вместо загрузки и пополняется
+
+# Деплой
+DEPLOY_STRATEGY="recreate"      # recreate | blue-green
+FRONTEND_PORT="8080"
+BACKEND_PORT="8000"
+GREEN_PORT_OFFSET="1"           # green-стек слушает порты FRONTEND_PORT+1 / BACKEND_PORT+1
+
+# Nginx
+NGINX_WORKER_CONNECTIONS="4096"
+NGINX_UPSTREAM_KEEPALIVE="32"   # простаивающих соединений к каждому upstream на воркер
+NGINX_PROXY_CONNECT_TIMEOUT="5s"
+NGINX_PROXY_SEND_TIMEOUT="60s"
+NGINX_PROXY_READ_TIMEOUT="60s"
+NGINX_PROXY_BUFFER_SIZE="16k"
+NGINX_PROXY_BUFFERS="8 32k"
+NGINX_PROXY_BUSY_BUFFERS_SIZE="64k"
+
+# Кеш ответов бэкенда (proxy_cache)
+BACKEND_CACHE="no"              # yes - кешировать GET-ответы бэкенда
+BACKEND_CACHE_ZONE_SIZE="10m"   # зона ключей, ~80000 ключей
+BACKEND_CACHE_MAX_SIZE="1g"
+BACKEND_CACHE_INACTIVE="60m"
+BACKEND_CACHE_TTL="1m"
+BACKEND_CACHE_LOCATIONS=""      # свои TTL: "/api/news/=5m /api/catalog/=1h"
+
+# TLS
+SSL_HTTP3="yes"                 # включается, только если nginx собран с http_v3_module
+SSL_SESSION_CACHE_SIZE="10m"    # ~40000 сессий
+SSL_SESSION_TIMEOUT="1d"
+SSL_SESSION_TICKETS="on"
+SSL_RESOLVER="1.1.1.1 8.8.8.8"  # для OCSP stapling
+
+# Статика
+BACKEND_STATIC_DIR="backend/staticfiles"   # относительно директории проекта
+FRONTEND_STATIC_EXPORT="yes"    # выгружать сборку фронтенда на хост и отдавать из nginx
+FRONTEND_SERVICE="frontend"
+FRONTEND_BUILD_PATH="/usr/share/nginx/html"   # путь к сборке внутри контейнера
+FRONTEND_STATIC_ROOT="/var/www"
+FRONTEND_IMMUTABLE_PATH="/assets/"
+STATIC_EXPIRES="7d"
+
+# Сборка
+BUILD_MODE="incremental"        # incremental | clean
+BUILD_CACHE_DIR=""              # постоянный кеш BuildKit (нужен docker buildx)
+RELEASES_KEEP="10"              # сколько релизов хранить для отката
+
+# Готовность после запуска
+READY_TIMEOUT="120"             # секунд на сервис по умолчанию
+READY_TIMEOUTS=""               # переопределения: "backend=180 frontend=60"
+
+# health-check --bench
+HEALTH_ENDPOINTS=""             # URL через пробел; по умолчанию порты стека и домены
+BENCH_REQUESTS="50"
+BENCH_CONCURRENCY="10"
+
+# fleet: запуск команд на нескольких серверах
+FLEET_PARALLEL="4"              # серверов одновременно
+FLEET_REMOTE_DIR="/root/server-setup"
+FLEET_SSH="ssh"
+FLEET_SSH_OPTIONS="-o BatchMode=yes -o ConnectTimeout=10 -o StrictHostKeyChecking=accept-new"
+
+# Ответы на вопросы модулей (пусто - спросить, в --non-interactive обязательны)
+MAINTENANCE_PAGE=""             # default | custom | /путь/к/файлу.html
+SUPPORT_EMAIL=""                # email на странице техработ, по умолчанию USER_EMAIL
+SSH_SHOW_KEY=""                 # yes | no - показать существующий публичный ключ
+REPO_PULL=""                    # yes | no - git pull, если репозиторий уже склонирован
+ENV_EDIT=""                     # yes | no - открыть .env в редакторе
+ENV_CREATE=""                   # yes | no - создать пустой .env при деплое, если его нет
+
+# Состояние деплоя (активный цвет и т.п.)
+STATE_DIR="/root/.server-setup"
+
 load_config() {
     if [ -f "$CONFIG_FILE" ]; then
         source "$CONFIG_FILE"
@@ -21,6 +101,58 @@ DOMAIN="$DOMAIN"
 BACKEND_DOMAIN="$BACKEND_DOMAIN"
 REPO_URL="$REPO_URL"
 USER_EMAIL="$USER_EMAIL"
+SITES="$SITES"
+APT_MODE="$APT_MODE"
+APT_PROXY="$APT_PROXY"
+APT_DEB_DIR="$APT_DEB_DIR"
+DEPLOY_STRATEGY="$DEPLOY_STRATEGY"
+FRONTEND_PORT="$FRONTEND_PORT"
+BACKEND_PORT="$BACKEND_PORT"
+GREEN_PORT_OFFSET="$GREEN_PORT_OFFSET"
+NGINX_WORKER_CONNECTIONS="$NGINX_WORKER_CONNECTIONS"
+NGINX_UPSTREAM_KEEPALIVE="$NGINX_UPSTREAM_KEEPALIVE"
+NGINX_PROXY_CONNECT_TIMEOUT="$NGINX_PROXY_CONNECT_TIMEOUT"
+NGINX_PROXY_SEND_TIMEOUT="$NGINX_PROXY_SEND_TIMEOUT"
+NGINX_PROXY_READ_TIMEOUT="$NGINX_PROXY_READ_TIMEOUT"
+NGINX_PROXY_BUFFER_SIZE="$NGINX_PROXY_BUFFER_SIZE"
+NGINX_PROXY_BUFFERS="$NGINX_PROXY_BUFFERS"
+NGINX_PROXY_BUSY_BUFFERS_SIZE="$NGINX_PROXY_BUSY_BUFFERS_SIZE"
+BACKEND_CACHE="$BACKEND_CACHE"
+BACKEND_CACHE_ZONE_SIZE="$BACKEND_CACHE_ZONE_SIZE"
+BACKEND_CACHE_MAX_SIZE="$BACKEND_CACHE_MAX_SIZE"
+BACKEND_CACHE_INACTIVE="$BACKEND_CACHE_INACTIVE"
+BACKEND_CACHE_TTL="$BACKEND_CACHE_TTL"
+BACKEND_CACHE_LOCATIONS="$BACKEND_CACHE_LOCATIONS"
+SSL_HTTP3="$SSL_HTTP3"
+SSL_SESSION_CACHE_SIZE="$SSL_SESSION_CACHE_SIZE"
+SSL_SESSION_TIMEOUT="$SSL_SESSION_TIMEOUT"
+SSL_SESSION_TICKETS="$SSL_SESSION_TICKETS"
+SSL_RESOLVER="$SSL_RESOLVER"
+BACKEND_STATIC_DIR="$BACKEND_STATIC_DIR"
+FRONTEND_STATIC_EXPORT="$FRONTEND_STATIC_EXPORT"
+FRONTEND_SERVICE="$FRONTEND_SERVICE"
+FRONTEND_BUILD_PATH="$FRONTEND_BUILD_PATH"
+FRONTEND_STATIC_ROOT="$FRONTEND_STATIC_ROOT"
+FRONTEND_IMMUTABLE_PATH="$FRONTEND_IMMUTABLE_PATH"
+STATIC_EXPIRES="$STATIC_EXPIRES"
+BUILD_MODE="$BUILD_MODE"
+BUILD_CACHE_DIR="$BUILD_CACHE_DIR"
+RELEASES_KEEP="$RELEASES_KEEP"
+READY_TIMEOUT="$READY_TIMEOUT"
+READY_TIMEOUTS="$READY_TIMEOUTS"
+HEALTH_ENDPOINTS="$HEALTH_ENDPOINTS"
+BENCH_REQUESTS="$BENCH_REQUESTS"
+BENCH_CONCURRENCY="$BENCH_CONCURRENCY"
+FLEET_PARALLEL="$FLEET_PARALLEL"
+FLEET_REMOTE_DIR="$FLEET_REMOTE_DIR"
+FLEET_SSH="$FLEET_SSH"
+FLEET_SSH_OPTIONS="$FLEET_SSH_OPTIONS"
+MAINTENANCE_PAGE="$MAINTENANCE_PAGE"
+SUPPORT_EMAIL="$SUPPORT_EMAIL"
+SSH_SHOW_KEY="$SSH_SHOW_KEY"
+REPO_PULL="$REPO_PULL"
+ENV_EDIT="$ENV_EDIT"
+ENV_CREATE="$ENV_CREATE"
 EOF
 }
 
@@ -30,4 +162,49 @@ print_config() {
     echo "  Бэкенд: $BACKEND_DOMAIN"
     echo "  Репозиторий: $REPO_URL"
     echo "  Email: $USER_EMAIL"
+    echo "  Дополнительных сайтов: $(echo "$SITES" | awk 'NF && $1 !~ /^#/' | wc -l)"
+    echo "  Стратегия деплоя: $DEPLOY_STRATEGY"
+    echo "  Режим сборки: $BUILD_MODE"
+}
+
+# Проверка перед неинтерактивной полной настройкой: все ответы заданы заранее,
+# чтобы не остановиться на середине после долгих шагов
+check_non_interactive_config() {
+    local missing=()
+    local var
+    
+    for var in DOMAIN BACKEND_DOMAIN USER_EMAIL REPO_URL MAINTENANCE_PAGE SSH_SHOW_KEY REPO_PULL ENV_EDIT ENV_CREATE; do
+        [ -n "${!var}" ] || missing+=("$var")
+    done
+    
+    for var in SSH_SHOW_KEY REPO_PULL ENV_EDIT ENV_CREATE; do
+        if [ -n "${!var}" ] && [[ ! "${!var}" =~ ^(yes|no)$ ]]; then
+            print_error "$var: ожидается yes или no, задано \"${!var}\""
+            return 1
+        fi
+    done
+    
+    if [ "$ENV_EDIT" = "yes" ]; then
+        print_error "ENV_EDIT=yes требует редактора, в неинтерактивном режиме задайте ENV_EDIT=no"
+        return 1
+    fi
+    
+    case "$MAINTENANCE_PAGE" in
+        ""|default|custom) ;;
+        /*)
+            if [ ! -f "$MAINTENANCE_PAGE" ]; then
+                print_error "MAINTENANCE_PAGE: файл не найден: $MAINTENANCE_PAGE"
+                return 1
+            fi
+            ;;
+        *)
+            print_error "MAINTENANCE_PAGE: ожидается default, custom или путь к HTML файлу"
+            return 1
+            ;;
+    esac
+    
+    if [ "${#missing[@]}" -gt 0 ]; then
+        print_error "Не заданы параметры в $CONFIG_FILE: ${missing[*]}"
+        return 1
+    fi
 }
\ No newline at end of file
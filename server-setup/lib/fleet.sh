@@ -0,0 +1,175 @@
+#!/bin/bash
+
+source "$(dirname "${BASH_SOURCE[0]}")/colors.sh"
+
+# Запуск команд CLI на нескольких серверах по SSH.
+# Инвентарь - по одному серверу на строку:
+#   root@10.0.0.1 [port=22] [config=hosts/app1.conf] [name=app1]
+# config - файл, который копируется в /root/server-setup.conf на сервере
+# name   - подпись в выводе, по умолчанию адрес
+# На каждый сервер копируются setup.sh, cli.sh, lib/ и modules/, затем команда
+# запускается с --non-interactive. Одновременно обрабатывается FLEET_PARALLEL серверов.
+
+FLEET_REMOTE_CONFIG="/root/server-setup.conf"
+
+# Строки инвентаря без комментариев
+fleet_hosts() {
+    local inventory="$1"
+
+    awk 'NF && $1 !~ /^#/' "$inventory"
+}
+
+# SSH к серверу: fleet_ssh destination port команда
+fleet_ssh() {
+    local destination="$1"
+    local port="$2"
+    shift 2
+
+    ${FLEET_SSH:-ssh} $FLEET_SSH_OPTIONS -p "$port" "$destination" "$@"
+}
+
+# Копирование скриптов (и конфигурации сервера, если указана)
+fleet_push() {
+    local destination="$1"
+    local port="$2"
+    local config="$3"
+    local remote_dir="${FLEET_REMOTE_DIR:-/root/server-setup}"
+
+    tar -C "$SCRIPT_DIR" -czf - setup.sh cli.sh lib modules | \
+        fleet_ssh "$destination" "$port" "mkdir -p '$remote_dir' && tar -xzf - -C '$remote_dir'" || return 1
+
+    if [ -n "$config" ]; then
+        fleet_ssh "$destination" "$port" "cat > '$FLEET_REMOTE_CONFIG' && chmod 600 '$FLEET_REMOTE_CONFIG'" < "$config" || return 1
+    fi
+}
+
+# Обработка одного сервера (запускается фоном): копирование, команда,
+# результат в $result_dir/<name>.result: "статус код копирование_мс команда_мс"
+fleet_host() {
+    local result_dir="$1"
+    local line="$2"
+    shift 2
+    local destination
+    local port="22"
+    local config=""
+    local name=""
+    local item
+    local start
+    local pushed
+    local code
+    local status
+
+    set -- $line "$@"
+    destination="$1"
+    shift
+
+    while [[ "$1" == *=* ]]; do
+        item="$1"
+        case "${item%%=*}" in
+            port) port="${item#*=}" ;;
+            config) config="${item#*=}" ;;
+            name) name="${item#*=}" ;;
+        esac
+        shift
+    done
+    name="${name:-$destination}"
+
+    start=$(date +%s%3N)
+
+    if ! fleet_push "$destination" "$port" "$config" > "$result_dir/$name.log" 2>&1; then
+        awk -v p="$name" '{ print p " | " $0 }' "$result_dir/$name.log"
+        echo "unreachable 255 $(( $(date +%s%3N) - start )) 0" > "$result_dir/$name.result"
+        return
+    fi
+    pushed=$(date +%s%3N)
+
+    fleet_ssh "$destination" "$port" \
+        "bash '${FLEET_REMOTE_DIR:-/root/server-setup}/cli.sh' --non-interactive $(printf '%q ' "$@")" < /dev/null 2>&1 | \
+        tee -a "$result_dir/$name.log" | \
+        awk -v p="$name" '{ print p " | " $0; fflush() }'
+    code=${PIPESTATUS[0]}
+
+    if [ "$code" -eq 0 ]; then
+        status="ok"
+    else
+        status="failed"
+    fi
+
+    echo "$status $code $(( pushed - start )) $(( $(date +%s%3N) - pushed ))" > "$result_dir/$name.result"
+}
+
+# Таблица результатов по серверам
+fleet_summary() {
+    local result_dir="$1"
+    local result
+    local status code push_ms run_ms
+
+    print_divider
+    # Заголовок выровнен вручную: printf считает ширину в байтах, а не в символах
+    echo "  Сервер                   Результат     Копир., с Команда, с    Код"
+    for result in "$result_dir"/*.result; do
+        [ -f "$result" ] || continue
+        read -r status code push_ms run_ms < "$result"
+        printf "  %-24s %-12s %10.1f %10.1f %6s\n" "$(basename "$result" .result)" "$status" \
+            "$(awk -v d="$push_ms" 'BEGIN { print d / 1000 }')" \
+            "$(awk -v d="$run_ms" 'BEGIN { print d / 1000 }')" "$code"
+    done
+    print_divider
+}
+
+# run_fleet inventory parallel команда [аргументы...]
+run_fleet() {
+    local inventory="$1"
+    local parallel="$2"
+    shift 2
+    local result_dir
+    local line
+    local start
+    local hosts=0
+    local finished
+
+    if [ ! -f "$inventory" ]; then
+        print_error "Файл инвентаря не найден: $inventory"
+        return 1
+    fi
+
+    if [ $# -eq 0 ]; then
+        print_error "Не указана команда для серверов"
+        return 1
+    fi
+
+    case "$1" in
+        config|fleet)
+            print_error "Команда $1 не выполняется через fleet"
+            return 1
+            ;;
+    esac
+
+    result_dir="$STATE_DIR/fleet/$(date +%Y%m%d-%H%M%S)"
+    mkdir -p "$result_dir"
+
+    print_info "Команда: $*, серверов одновременно: $parallel, логи: $result_dir"
+    start=$(date +%s%3N)
+
+    while read -r line; do
+        while [ "$(jobs -rp | wc -l)" -ge "$parallel" ]; do
+            wait -n
+        done
+
+        fleet_host "$result_dir" "$line" "$@" < /dev/null &
+        hosts=$((hosts + 1))
+    done < <(fleet_hosts "$inventory")
+
+    wait
+
+    fleet_summary "$result_dir"
+    print_info "Серверов: $hosts, общее время: $(awk -v d="$(( $(date +%s%3N) - start ))" 'BEGIN { printf "%.1f", d / 1000 }') с"
+
+    finished=$(cat "$result_dir"/*.result 2>/dev/null | grep -c "^ok ")
+    if [ "$finished" -ne "$hosts" ]; then
+        print_error "Команда завершилась с ошибками на части серверов"
+        return 1
+    fi
+
+    print_success "Команда выполнена на всех серверах"
+}
\ No newline at end of file
@@ -20,9 +20,40 @@ check_success() {
     fi
 }
 
-# Подтверждение действия
+# Неинтерактивный режим (--non-interactive): ответы на все вопросы берутся
+# из конфигурации, отсутствующее значение - ошибка
+NON_INTERACTIVE="${NON_INTERACTIVE:-no}"
+
+# Остановка, если для вопроса нет значения в конфигурации
+require_interactive() {
+    local message="$1"
+    local var_name="$2"
+    
+    if [ "$NON_INTERACTIVE" = "yes" ]; then
+        print_error "$message: в неинтерактивном режиме задайте $var_name в ${CONFIG_FILE:-конфигурации}"
+        exit 1
+    fi
+}
+
+# Подтверждение действия. Если указан параметр конфигурации и он задан (yes/no),
+# ответ берется из него без вопроса
 confirm_action() {
     local message="$1"
+    local var_name="$2"
+    local response=""
+    
+    if [ -n "$var_name" ]; then
+        response="${!var_name}"
+    fi
+    
+    if [ -n "$response" ]; then
+        print_info "$message: $response ($var_name)"
+        [[ "$response" =~ ^([Yy]|yes)$ ]]
+        return
+    fi
+    
+    require_interactive "$message" "${var_name:-ответ}"
+    
     read -p "$(echo -e ${YELLOW}"$message (y/n): "${NC})" response
     [[ "$response" =~ ^[Yy]$ ]]
 }
@@ -33,6 +64,14 @@ input_with_check() {
     local var_name="$2"
     local default_value="$3"
     
+    if [ "$NON_INTERACTIVE" = "yes" ]; then
+        if [ -z "$default_value" ]; then
+            require_interactive "$prompt" "$var_name"
+        fi
+        eval "$var_name=\"$default_value\""
+        return
+    fi
+    
     if [ -n "$default_value" ]; then
         prompt="$prompt [по умолчанию: $default_value]: "
     else
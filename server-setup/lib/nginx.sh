@@ -0,0 +1,149 @@
+#!/bin/bash
+
+source "$(dirname "${BASH_SOURCE[0]}")/colors.sh"
+
+# Общие функции для работы с конфигурацией nginx
+
+NGINX_UPSTREAMS_DIR="/etc/nginx/upstreams"
+NGINX_PROXY_SETTINGS_FILE="/etc/nginx/snippets/proxy-tuning.conf"
+NGINX_CACHE_SETTINGS_FILE="/etc/nginx/snippets/backend-cache.conf"
+NGINX_CACHE_DIR="/var/cache/nginx/backend"
+
+# Имя upstream для домена: api.example.com -> api_example_com
+nginx_upstream_name() {
+    echo "$1" | tr -c 'a-zA-Z0-9_\n' '_'
+}
+
+# Директивы проксирования в upstream для тела location
+nginx_proxy_directives() {
+    cat << EOF
+        proxy_pass http://$1;
+        include $NGINX_PROXY_SETTINGS_FILE;
+        proxy_set_header Host \$host;
+        proxy_set_header X-Real-IP \$remote_addr;
+        proxy_set_header X-Forwarded-For \$proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto \$scheme;
+EOF
+}
+
+# Файл с upstream-блоками сайта
+nginx_upstreams_file() {
+    echo "$NGINX_UPSTREAMS_DIR/${DOMAIN}.conf"
+}
+
+# Порты стека заданного цвета (blue - базовые порты, green - со смещением)
+# Результат в переменных COLOR_FRONTEND_PORT и COLOR_BACKEND_PORT
+color_ports() {
+    local color="$1"
+    local offset=0
+
+    if [ "$color" = "green" ]; then
+        offset="${GREEN_PORT_OFFSET:-1}"
+    fi
+
+    COLOR_FRONTEND_PORT=$((FRONTEND_PORT + offset))
+    COLOR_BACKEND_PORT=$((BACKEND_PORT + offset))
+}
+
+# Атомарная запись upstream-блоков: временный файл + mv
+write_nginx_upstreams() {
+    local frontend_port="$1"
+    local backend_port="$2"
+    local upstreams_file
+    upstreams_file="$(nginx_upstreams_file)"
+
+    mkdir -p "$NGINX_UPSTREAMS_DIR"
+
+    cat > "${upstreams_file}.tmp" << EOF
+upstream $(nginx_upstream_name "$DOMAIN") {
+    server 127.0.0.1:$frontend_port;
+    keepalive ${NGINX_UPSTREAM_KEEPALIVE:-32};
+}
+
+upstream $(nginx_upstream_name "$BACKEND_DOMAIN") {
+    server 127.0.0.1:$backend_port;
+    keepalive ${NGINX_UPSTREAM_KEEPALIVE:-32};
+}
+EOF
+    mv -f "${upstreams_file}.tmp" "$upstreams_file"
+}
+
+# Переключение upstream на другие порты с проверкой конфигурации.
+# При ошибке nginx -t возвращается предыдущий файл.
+switch_nginx_upstreams() {
+    local frontend_port="$1"
+    local backend_port="$2"
+    local upstreams_file
+    upstreams_file="$(nginx_upstreams_file)"
+
+    if [ -f "$upstreams_file" ]; then
+        cp -f "$upstreams_file" "${upstreams_file}.bak"
+    fi
+
+    write_nginx_upstreams "$frontend_port" "$backend_port"
+
+    if ! nginx -t >/dev/null 2>&1; then
+        print_error "Ошибка в конфигурации nginx, возвращаем предыдущие upstream"
+        if [ -f "${upstreams_file}.bak" ]; then
+            mv -f "${upstreams_file}.bak" "$upstreams_file"
+        fi
+        return 1
+    fi
+
+    systemctl reload nginx
+}
+
+# Общие настройки проксирования: HTTP/1.1 к upstream (нужно для keepalive),
+# буферы и таймауты. Подключается через include в каждом location с proxy_pass
+write_nginx_proxy_settings() {
+    mkdir -p "$(dirname "$NGINX_PROXY_SETTINGS_FILE")"
+
+    cat > "$NGINX_PROXY_SETTINGS_FILE" << EOF
+proxy_http_version 1.1;
+proxy_set_header Connection "";
+
+proxy_connect_timeout ${NGINX_PROXY_CONNECT_TIMEOUT:-5s};
+proxy_send_timeout ${NGINX_PROXY_SEND_TIMEOUT:-60s};
+proxy_read_timeout ${NGINX_PROXY_READ_TIMEOUT:-60s};
+
+proxy_buffering on;
+proxy_buffer_size ${NGINX_PROXY_BUFFER_SIZE:-16k};
+proxy_buffers ${NGINX_PROXY_BUFFERS:-8 32k};
+proxy_busy_buffers_size ${NGINX_PROXY_BUSY_BUFFERS_SIZE:-64k};
+EOF
+}
+
+# worker_connections в /etc/nginx/nginx.conf
+tune_nginx_workers() {
+    local connections="${NGINX_WORKER_CONNECTIONS:-4096}"
+
+    sed -i "s/worker_connections[[:space:]]*[0-9]*;/worker_connections $connections;/" /etc/nginx/nginx.conf
+}
+
+# Лог бэкенда со статусом кеша: первое поле - \$upstream_cache_status
+nginx_cache_log_file() {
+    local domain="${1:-$BACKEND_DOMAIN}"
+
+    echo "/var/log/nginx/${domain}.cache.log"
+}
+
+# Общие настройки кеширования ответов бэкенда. Ответы с Set-Cookie или
+# Cache-Control: private/no-cache nginx не кеширует сам, авторизованные запросы
+# идут мимо кеша
+write_nginx_cache_settings() {
+    mkdir -p "$(dirname "$NGINX_CACHE_SETTINGS_FILE")" "$NGINX_CACHE_DIR"
+    chown www-data:www-data "$NGINX_CACHE_DIR" 2>/dev/null
+
+    cat > "$NGINX_CACHE_SETTINGS_FILE" << EOF
+proxy_cache backend_cache;
+proxy_cache_key \$scheme\$host\$request_uri;
+proxy_cache_methods GET HEAD;
+proxy_cache_use_stale updating error timeout http_500 http_502 http_503 http_504;
+proxy_cache_background_update on;
+proxy_cache_lock on;
+proxy_cache_lock_timeout 5s;
+proxy_cache_bypass \$http_authorization \$cookie_sessionid;
+proxy_no_cache \$http_authorization \$cookie_sessionid;
+add_header X-Cache-Status \$upstream_cache_status always;
+EOF
+}
\ No newline at end of file
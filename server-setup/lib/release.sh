@@ -0,0 +1,138 @@
+#!/bin/bash
+
+source "$(dirname "${BASH_SOURCE[0]}")/colors.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/build.sh"
+
+# Релизы: образы каждого деплоя сохраняются с тегом по SHA коммита,
+# откат - это перетегирование и перезапуск без пересборки.
+# История: STATE_DIR/releases, строки "id sha дата" (последняя - текущий релиз)
+
+releases_file() {
+    echo "$STATE_DIR/releases"
+}
+
+# Образы сервисов стека: "сервис образ"
+stack_images() {
+    local color="$1"
+    local project
+    local service context image
+
+    project=$(compose_project_name "$color")
+
+    while read -r service context image; do
+        if [ "$image" = "-" ]; then
+            image="${project}_${service}"
+        fi
+        echo "$service $image"
+    done < <(service_build_contexts)
+}
+
+# Образ сервиса в релизе (не зависит от цвета стека)
+release_image() {
+    local service="$1"
+    local id="$2"
+
+    echo "$(compose_project_name)_${service}:$id"
+}
+
+release_sha() {
+    awk -v id="$1" '$1 == id { sha = $2 } END { print sha }' "$(releases_file)" 2>/dev/null
+}
+
+release_exists() {
+    [ -n "$(release_sha "$1")" ]
+}
+
+current_release() {
+    tail -n 1 "$(releases_file)" 2>/dev/null | awk '{ print $1 }'
+}
+
+# Релиз, который был текущим до последнего
+previous_release() {
+    local current
+    current=$(current_release)
+
+    tac "$(releases_file)" 2>/dev/null | awk -v current="$current" '$1 != current { print $1; exit }'
+}
+
+record_release_entry() {
+    local id="$1"
+    local sha="$2"
+
+    mkdir -p "$STATE_DIR"
+    echo "$id $sha $(date -u +%Y-%m-%dT%H:%M:%SZ)" >> "$(releases_file)"
+}
+
+# Тегирование образов запущенного стека как релиза текущего коммита
+create_release() {
+    local color="$1"
+    local id
+    local service image
+
+    id=$(git rev-parse --short HEAD)
+
+    while read -r service image; do
+        docker tag "$image" "$(release_image "$service" "$id")"
+        if [ $? -ne 0 ]; then
+            print_warning "Не удалось сохранить образ $image в релиз $id"
+            return 1
+        fi
+    done < <(stack_images "$color")
+
+    record_release_entry "$id" "$(git rev-parse HEAD)"
+    prune_releases
+    print_success "Релиз $id сохранен"
+}
+
+# Образы релиза под именами, которые использует docker-compose для стека
+restore_release() {
+    local id="$1"
+    local color="$2"
+    local service image
+
+    while read -r service image; do
+        docker tag "$(release_image "$service" "$id")" "$image" 2>/dev/null
+        if [ $? -ne 0 ]; then
+            print_error "Образ релиза $id для сервиса $service не найден"
+            return 1
+        fi
+    done < <(stack_images "$color")
+}
+
+# Удаление образов и записей релизов сверх RELEASES_KEEP последних
+prune_releases() {
+    local keep="${RELEASES_KEEP:-10}"
+    local file
+    local id service image
+
+    file=$(releases_file)
+
+    for id in $(tac "$file" | awk '!seen[$1]++ { print $1 }' | tail -n +$((keep + 1))); do
+        while read -r service image; do
+            docker rmi "$(release_image "$service" "$id")" > /dev/null 2>&1
+        done < <(stack_images)
+        grep -v "^$id " "$file" > "${file}.tmp"
+        mv -f "${file}.tmp" "$file"
+    done
+}
+
+list_releases() {
+    local current
+    local id sha date
+
+    if [ ! -s "$(releases_file)" ]; then
+        print_warning "История релизов пуста"
+        return 0
+    fi
+
+    current=$(current_release)
+
+    print_info "Релизы (новые сверху):"
+    tac "$(releases_file)" | awk '!seen[$1]++' | while read -r id sha date; do
+        if [ "$id" = "$current" ]; then
+            echo "  * $id  $date  (текущий)"
+        else
+            echo "    $id  $date"
+        fi
+    done
+}
\ No newline at end of file
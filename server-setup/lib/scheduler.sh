@@ -0,0 +1,240 @@
+#!/bin/bash
+
+source "$(dirname "${BASH_SOURCE[0]}")/colors.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/checkpoint.sh"
+
+# Параллельный запуск модулей с учетом зависимостей.
+# Модуль объявляет зависимости в заголовке файла:
+#   # requires: 01_system_update.sh 02_packages.sh
+#   # interactive: yes      - задает вопросы, запускается на переднем плане
+#                             (кроме режима --non-interactive)
+# Независимые модули выполняются фоном, их вывод пишется в отдельные логи.
+# Модули без изменений с прошлого успешного запуска пропускаются (checkpoint.sh).
+
+module_header() {
+    local module="$1"
+    local key="$2"
+
+    sed -n "s/^# $key:[[:space:]]*//p" "$SCRIPT_DIR/modules/$module" | head -n 1
+}
+
+# Состояние зависимостей модуля: done | waiting | failed.
+# Использует массивы requires/state из schedule_modules; зависимости вне списка считаются выполненными
+scheduler_dependency_state() {
+    local module="$1"
+    local dep
+    local result="done"
+
+    for dep in ${requires[$module]}; do
+        case "${state[$dep]:-done}" in
+            done|cached) ;;
+            failed|skipped) echo "failed"; return ;;
+            *) result="waiting" ;;
+        esac
+    done
+
+    echo "$result"
+}
+
+# Можно ли пропустить модуль: не указан в --force/--from, зависимости не выполнялись
+# в этом запуске и хеш входных данных совпадает с последним успешным выполнением
+scheduler_cached() {
+    local module="$1"
+    local dep
+    local hash
+
+    [ -z "${forced[$module]}" ] || return 1
+    [ "${checkpoint[$module]}" != "no" ] || return 1
+
+    for dep in ${requires[$module]}; do
+        [ "${state[$dep]}" = "done" ] && return 1
+    done
+
+    hash=$(module_input_hash "$module" "${functions[$module]}")
+    [ "$hash" = "$(checkpoint_hash "$module")" ]
+}
+
+# Запись результата модуля в файл состояния
+scheduler_checkpoint() {
+    local module="$1"
+
+    [ "${checkpoint[$module]}" != "no" ] || return 0
+
+    if [ "${state[$module]}" = "done" ]; then
+        checkpoint_save "$module" "$(module_input_hash "$module" "${functions[$module]}")"
+    else
+        checkpoint_clear "$module"
+    fi
+}
+
+# Функции модуля по очереди (запускается в подоболочке)
+scheduler_run_functions() {
+    local module="$1"
+    local fn
+
+    run_module "$module" || exit 1
+    for fn in ${functions[$module]//,/ }; do
+        "$fn" || exit 1
+    done
+}
+
+# schedule_modules "01_system_update.sh:system_update" "08_repo_setup.sh:setup_repository,setup_env_file" ...
+schedule_modules() {
+    local -A functions=()
+    local -A requires=()
+    local -A interactive=()
+    local -A checkpoint=()
+    local -A forced=()
+    local -A state=()
+    local -A pids=()
+    local -A started=()
+    local -A finished=()
+    local order=()
+    local spec module dep
+    local log_dir
+    local total_start
+    local running
+    local progress
+    local failed=0
+    local from_reached=0
+
+    log_dir="$STATE_DIR/logs/$(date +%Y%m%d-%H%M%S)"
+    mkdir -p "$log_dir"
+
+    for spec in "$@"; do
+        module="${spec%%:*}"
+        order+=("$module")
+        functions[$module]="${spec#*:}"
+        requires[$module]="$(module_header "$module" requires)"
+        interactive[$module]="$(module_header "$module" interactive)"
+        checkpoint[$module]="$(module_header "$module" checkpoint)"
+        state[$module]="pending"
+
+        # В неинтерактивном режиме вопросов нет, все модули можно запускать фоном
+        [ "$NON_INTERACTIVE" = "yes" ] && interactive[$module]=""
+
+        [ "$module" = "$CHECKPOINT_FROM" ] && from_reached=1
+        if [ "$from_reached" -eq 1 ] || checkpoint_forced "$module"; then
+            forced[$module]=1
+        fi
+    done
+
+    print_info "Логи модулей: $log_dir"
+    total_start=$(date +%s%3N)
+
+    while true; do
+        progress=0
+        running=0
+
+        # Завершившиеся фоновые модули
+        for module in "${!pids[@]}"; do
+            if ! kill -0 "${pids[$module]}" 2>/dev/null; then
+                if wait "${pids[$module]}"; then
+                    state[$module]="done"
+                    print_success "$module завершен"
+                else
+                    state[$module]="failed"
+                    print_error "$module завершился с ошибкой, последние строки лога:"
+                    tail -n 10 "$log_dir/$module.log"
+                fi
+                finished[$module]=$(date +%s%3N)
+                scheduler_checkpoint "$module"
+                unset "pids[$module]"
+                progress=1
+            fi
+        done
+
+        # Запуск фоновых модулей, у которых выполнены зависимости
+        for module in "${order[@]}"; do
+            [ "${state[$module]}" = "pending" ] || continue
+
+            case "$(scheduler_dependency_state "$module")" in
+                failed)
+                    state[$module]="skipped"
+                    print_warning "$module пропущен: не выполнена зависимость"
+                    progress=1
+                    ;;
+                done)
+                    if scheduler_cached "$module"; then
+                        state[$module]="cached"
+                        print_success "$module без изменений, пропущен"
+                        progress=1
+                        continue
+                    fi
+                    [ "${interactive[$module]}" = "yes" ] && continue
+                    state[$module]="running"
+                    started[$module]=$(date +%s%3N)
+                    print_info "Запуск $module в фоне..."
+                    ( scheduler_run_functions "$module" ) > "$log_dir/$module.log" 2>&1 < /dev/null &
+                    pids[$module]=$!
+                    progress=1
+                    ;;
+            esac
+        done
+
+        # Один интерактивный модуль на переднем плане, фоновые продолжают работать
+        for module in "${order[@]}"; do
+            [ "${state[$module]}" = "pending" ] || continue
+            [ "${interactive[$module]}" = "yes" ] || continue
+            [ "$(scheduler_dependency_state "$module")" = "done" ] || continue
+
+            state[$module]="running"
+            started[$module]=$(date +%s%3N)
+            ( scheduler_run_functions "$module" ) 2>&1 | tee "$log_dir/$module.log"
+            if [ "${PIPESTATUS[0]}" -eq 0 ]; then
+                state[$module]="done"
+            else
+                state[$module]="failed"
+                print_error "$module завершился с ошибкой"
+            fi
+            finished[$module]=$(date +%s%3N)
+            scheduler_checkpoint "$module"
+            progress=1
+            break
+        done
+
+        for module in "${order[@]}"; do
+            case "${state[$module]}" in
+                pending|running) running=1 ;;
+            esac
+        done
+
+        [ "$running" -eq 0 ] && break
+
+        if [ "$progress" -eq 0 ] && [ "${#pids[@]}" -eq 0 ]; then
+            print_error "Циклическая зависимость между модулями, остановка"
+            for module in "${order[@]}"; do
+                [ "${state[$module]}" = "pending" ] && state[$module]="skipped"
+            done
+            break
+        fi
+
+        [ "$progress" -eq 0 ] && sleep 0.2
+    done
+
+    # Итоги по времени
+    local total=$(( $(date +%s%3N) - total_start ))
+    local sum=0
+    local duration
+
+    print_divider
+    print_info "Время выполнения модулей:"
+    for module in "${order[@]}"; do
+        if [ -n "${started[$module]}" ] && [ -n "${finished[$module]}" ]; then
+            duration=$(( ${finished[$module]} - ${started[$module]} ))
+            sum=$(( sum + duration ))
+            printf "  %-22s %-8s %8.1f с\n" "$module" "${state[$module]}" "$(awk -v d="$duration" 'BEGIN { print d / 1000 }')"
+        else
+            printf "  %-22s %-8s %10s\n" "$module" "${state[$module]}" "-"
+        fi
+        case "${state[$module]}" in
+            done|cached) ;;
+            *) failed=1 ;;
+        esac
+    done
+    printf "  %-31s %8.1f с (последовательно было бы %.1f с)\n" "Всего" \
+        "$(awk -v d="$total" 'BEGIN { print d / 1000 }')" "$(awk -v d="$sum" 'BEGIN { print d / 1000 }')"
+    print_divider
+
+    return "$failed"
+}
\ No newline at end of file
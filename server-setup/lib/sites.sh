@@ -0,0 +1,152 @@
+#!/bin/bash
+
+source "$(dirname "${BASH_SOURCE[0]}")/colors.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/nginx.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/static.sh"
+
+# Дополнительные сайты на сервере, описываются в SITES по одному на строку:
+#   домен port=8081 [static=/var/www/app] [alias=/static/=/root/app/staticfiles] [cache=5m]
+# port   - порт приложения на localhost
+# static - корень со статикой, отдается nginx, остальное проксируется в приложение
+# alias  - префикс URL и директория, которые отдаются с диска
+# cache  - TTL кеширования GET-ответов приложения
+
+site_domains() {
+    echo "$SITES" | awk 'NF && $1 !~ /^#/ { print $1 }'
+}
+
+# Нужна ли зона proxy_cache: кеш основного бэкенда или хотя бы одного сайта
+nginx_cache_needed() {
+    [ "$BACKEND_CACHE" = "yes" ] || echo "$SITES" | grep -q "cache="
+}
+
+# Upstream и server-блок одного сайта
+render_site() {
+    local domain="$1"
+    shift
+    local port=""
+    local static=""
+    local alias=""
+    local cache=""
+    local item
+    local upstream
+    local proxy_block
+
+    for item in "$@"; do
+        case "${item%%=*}" in
+            port) port="${item#*=}" ;;
+            static) static="${item#*=}" ;;
+            alias) alias="${item#*=}" ;;
+            cache) cache="${item#*=}" ;;
+            *)
+                print_error "$domain: неизвестный параметр $item" >&2
+                return 1
+                ;;
+        esac
+    done
+
+    if ! [[ "$port" =~ ^[0-9]+$ ]]; then
+        print_error "$domain: не указан port" >&2
+        return 1
+    fi
+
+    if [ -n "$alias" ] && [[ "$alias" != /*=/* ]]; then
+        print_error "$domain: alias задается как /префикс/=/директория" >&2
+        return 1
+    fi
+
+    upstream=$(nginx_upstream_name "$domain")
+    proxy_block=$(nginx_proxy_directives "$upstream")
+    if [ -n "$cache" ]; then
+        proxy_block="$proxy_block
+        include $NGINX_CACHE_SETTINGS_FILE;
+        proxy_cache_valid 200 301 302 $cache;"
+    fi
+
+    cat << EOF
+
+upstream $upstream {
+    server 127.0.0.1:$port;
+    keepalive ${NGINX_UPSTREAM_KEEPALIVE:-32};
+}
+
+server {
+    server_name $domain;
+EOF
+
+    if [ -n "$cache" ]; then
+        echo "    access_log $(nginx_cache_log_file "$domain") cache_status;"
+    fi
+
+    if [ -n "$static" ]; then
+        cat << EOF
+
+    root $static;
+    include $NGINX_STATIC_SETTINGS_FILE;
+
+    location / {
+        try_files \$uri \$uri/index.html @app;
+    }
+
+    location ${FRONTEND_IMMUTABLE_PATH:-/assets/} {
+        try_files \$uri @app;
+        expires max;
+        add_header Cache-Control "public, immutable";
+    }
+
+    location @app {
+$proxy_block
+    }
+EOF
+    else
+        cat << EOF
+
+    location / {
+$proxy_block
+    }
+EOF
+    fi
+
+    if [ -n "$alias" ]; then
+        cat << EOF
+
+    location ${alias%%=*} {
+        alias ${alias#*=}/;
+        include $NGINX_STATIC_SETTINGS_FILE;
+        expires ${STATIC_EXPIRES:-7d};
+    }
+EOF
+    fi
+
+    cat << EOF
+
+    error_page 502 /maintenance.html;
+    location = /maintenance.html {
+        root /etc/nginx/html;
+        internal;
+    }
+}
+EOF
+}
+
+# Все сайты из SITES за один проход. Повтор домена - ошибка
+render_sites() {
+    local line
+    local seen=" $DOMAIN $BACKEND_DOMAIN "
+
+    while read -r line; do
+        if [ -z "$line" ] || [[ "$line" == \#* ]]; then
+            continue
+        fi
+
+        set -- $line
+
+        if [[ "$seen" == *" $1 "* ]]; then
+            print_error "Домен $1 описан дважды" >&2
+            return 1
+        fi
+        seen="$seen$1 "
+
+        render_site "$@" || return 1
+    done <<< "$SITES"
+}
\ No newline at end of file
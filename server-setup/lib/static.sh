@@ -0,0 +1,74 @@
+#!/bin/bash
+
+source "$(dirname "${BASH_SOURCE[0]}")/colors.sh"
+
+# Статика, которую nginx отдает напрямую с диска
+
+NGINX_STATIC_SETTINGS_FILE="/etc/nginx/snippets/static-files.conf"
+
+# Директория выгруженной сборки фронтенда: releases/<sha> и симлинк current
+frontend_static_dir() {
+    echo "${FRONTEND_STATIC_ROOT:-/var/www}/$DOMAIN"
+}
+
+# Директория статики бэкенда в репозитории
+backend_static_dir() {
+    echo "/root/$(basename "$REPO_URL" .git)/${BACKEND_STATIC_DIR:-backend/staticfiles}"
+}
+
+# Общие настройки отдачи файлов, подключаются через include
+write_nginx_static_settings() {
+    mkdir -p "$(dirname "$NGINX_STATIC_SETTINGS_FILE")"
+
+    cat > "$NGINX_STATIC_SETTINGS_FILE" << EOF
+sendfile on;
+tcp_nopush on;
+
+open_file_cache max=10000 inactive=60s;
+open_file_cache_valid 60s;
+open_file_cache_min_uses 2;
+open_file_cache_errors on;
+EOF
+}
+
+# Выгрузка сборки фронтенда из контейнера на хост.
+# Каждая выгрузка - отдельная директория, current переключается атомарно
+export_frontend_static() {
+    local color="$1"
+    local container
+    local static_dir
+    local release_dir
+
+    if [ "$FRONTEND_STATIC_EXPORT" != "yes" ]; then
+        return 0
+    fi
+
+    container=$(stack_compose "$color" ps -q "${FRONTEND_SERVICE:-frontend}" 2>/dev/null | head -n 1)
+
+    if [ -z "$container" ]; then
+        print_warning "Контейнер ${FRONTEND_SERVICE:-frontend} не найден, статика фронтенда не выгружена"
+        return 1
+    fi
+
+    static_dir=$(frontend_static_dir)
+    release_dir="$static_dir/releases/$(git rev-parse --short HEAD)-$(date +%s)"
+
+    print_info "Выгрузка сборки фронтенда в $release_dir..."
+    mkdir -p "$release_dir"
+
+    docker cp "$container:${FRONTEND_BUILD_PATH:-/usr/share/nginx/html}/." "$release_dir"
+    if [ $? -ne 0 ]; then
+        print_warning "Не удалось скопировать ${FRONTEND_BUILD_PATH:-/usr/share/nginx/html} из контейнера"
+        rm -rf "$release_dir"
+        return 1
+    fi
+
+    chmod -R a+rX "$release_dir"
+    ln -sfn "$release_dir" "$static_dir/current.tmp"
+    mv -Tf "$static_dir/current.tmp" "$static_dir/current"
+
+    # Старые выгрузки сверх RELEASES_KEEP
+    ls -1dt "$static_dir"/releases/*/ 2>/dev/null | tail -n +$((${RELEASES_KEEP:-10} + 1)) | xargs -r rm -rf
+
+    print_success "Статика фронтенда выгружена"
+}
\ No newline at end of file
@@ -1,17 +1,25 @@
 #!/bin/bash
+# inputs: APT_*
 
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/helpers.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/apt.sh"
 
 system_update() {
     print_step "1. ОБНОВЛЕНИЕ СИСТЕМЫ"
     
     print_info "Обновление списка пакетов..."
-    apt update
+    apt_update
     check_success "Список пакетов обновлен" "Ошибка при обновлении пакетов"
     
-    print_info "Обновление системы..."
-    apt upgrade -y
-    check_success "Система обновлена" "Ошибка при обновлении системы"
+    if [ "$APT_MODE" = "single" ]; then
+        print_info "Обновление системы и установка пакетов одной транзакцией..."
+        apt_single_transaction
+        check_success "Система обновлена, пакеты установлены" "Ошибка при обновлении системы"
+    else
+        print_info "Обновление системы..."
+        apt upgrade -y
+        check_success "Система обновлена" "Ошибка при обновлении системы"
+    fi
     
     print_success "Обновление системы завершено"
 }
\ No newline at end of file
@@ -1,13 +1,23 @@
 #!/bin/bash
+# requires: 01_system_update.sh
+# inputs: APT_*
 
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/helpers.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/apt.sh"
 
 install_packages() {
     print_step "2. УСТАНОВКА НЕОБХОДИМЫХ ПАКЕТОВ"
     
+    # В режиме single пакеты ставятся вместе с обновлением системы
+    if [ "$APT_MODE" = "single" ] && apt_packages_installed; then
+        print_success "Пакеты уже установлены при обновлении системы"
+        return 0
+    fi
+    
     print_info "Установка nginx, certbot, git, docker и ufw..."
-    apt install -y nginx certbot python3-certbot-nginx git docker.io docker-compose ufw
+    apt install -y $APT_PACKAGES
     check_success "Пакеты установлены" "Ошибка при установке пакетов"
+    harvest_apt_cache
     
     print_success "Установка пакетов завершена"
 }
\ No newline at end of file
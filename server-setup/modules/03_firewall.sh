@@ -1,4 +1,6 @@
 #!/bin/bash
+# requires: 02_packages.sh
+# inputs: none
 
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/helpers.sh"
 
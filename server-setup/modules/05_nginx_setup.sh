@@ -1,7 +1,13 @@
 #!/bin/bash
+# requires: 02_packages.sh
+# interactive: yes
+# inputs: DOMAIN USER_EMAIL SUPPORT_EMAIL MAINTENANCE_PAGE REPO_URL SITES DEPLOY_STRATEGY GREEN_PORT_OFFSET STATIC_EXPIRES NGINX_* BACKEND_* FRONTEND_*
 
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/helpers.sh"
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/config.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/nginx.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/static.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/sites.sh"
 
 setup_nginx() {
     print_step "5. НАСТРОЙКА NGINX"
@@ -16,21 +22,45 @@ setup_nginx() {
     # Настройка страницы технических работ
     setup_maintenance_page
     
+    # Upstream-блоки в отдельном файле: при blue/green деплое переключается только он
+    print_info "Создание upstream для активного стека..."
+    local active_color
+    active_color=$(cat "$STATE_DIR/active_color" 2>/dev/null || echo "blue")
+    color_ports "$active_color"
+    write_nginx_upstreams "$COLOR_FRONTEND_PORT" "$COLOR_BACKEND_PORT"
+    check_success "Upstream созданы ($active_color)" "Ошибка при создании upstream"
+    
+    # Keepalive к upstream, буферы и таймауты проксирования
+    print_info "Настройка проксирования и worker_connections..."
+    write_nginx_proxy_settings && write_nginx_static_settings && tune_nginx_workers
+    check_success "Параметры nginx применены" "Ошибка при настройке параметров nginx"
+    
+    if nginx_cache_needed; then
+        print_info "Настройка кеширования ответов бэкенда..."
+        write_nginx_cache_settings
+        check_success "Кеш бэкенда настроен" "Ошибка при настройке кеша бэкенда"
+    fi
+    
+    # Дополнительные сайты из SITES
+    local extra_sites=""
+    if [ -n "$(site_domains)" ]; then
+        print_info "Генерация дополнительных сайтов: $(site_domains | wc -l)..."
+        extra_sites=$(render_sites)
+        check_success "Сайты сгенерированы" "Ошибка в описании сайтов (SITES)"
+    fi
+    
     # Создание конфигурации nginx
     print_info "Создание конфигурации nginx..."
-    CONFIG_FILE="/etc/nginx/sites-available/${DOMAIN}"
+    NGINX_SITE_FILE="/etc/nginx/sites-available/${DOMAIN}"
     
-    cat > "$CONFIG_FILE" << EOF
+    cat > "$NGINX_SITE_FILE" << EOF
+include $(nginx_upstreams_file);
+$(nginx_backend_cache_zone)
+
 server {
     server_name $DOMAIN;
 
-    location / {
-        proxy_pass http://localhost:8080;
-        proxy_set_header Host \$host;
-        proxy_set_header X-Real-IP \$remote_addr;
-        proxy_set_header X-Forwarded-For \$proxy_add_x_forwarded_for;
-        proxy_set_header X-Forwarded-Proto \$scheme;
-    }
+$(nginx_frontend_locations)
 
     error_page 502 /maintenance.html;
     location = /maintenance.html {
@@ -42,17 +72,18 @@ server {
 server {
     server_name $BACKEND_DOMAIN;
 
-    location / {
-        proxy_pass http://localhost:8000;
-        proxy_set_header Host \$host;
-        proxy_set_header X-Real-IP \$remote_addr;
-        proxy_set_header X-Forwarded-For \$proxy_add_x_forwarded_for;
-        proxy_set_header X-Forwarded-Proto \$scheme;
-    }
+$(nginx_backend_locations)
 
     location /static/ {
-        alias /root/FoodMind.AI/backend/staticfiles/;
-        autoindex on;
+        alias $(backend_static_dir)/;
+        include $NGINX_STATIC_SETTINGS_FILE;
+        expires ${STATIC_EXPIRES:-7d};
+
+        # Файлы с хешем в имени (ManifestStaticFilesStorage) не меняются
+        location ~* "\.[0-9a-f]{8,}\.[a-z0-9]+\$" {
+            expires max;
+            add_header Cache-Control "public, immutable";
+        }
     }
 
     error_page 502 /maintenance.html;
@@ -61,12 +92,13 @@ server {
         internal;
     }
 }
+$extra_sites
 EOF
     check_success "Конфигурация nginx создана" "Ошибка при создании конфигурации"
     
     # Активация конфигурации
     print_info "Активация конфигурации..."
-    ln -sf "$CONFIG_FILE" "/etc/nginx/sites-enabled/${DOMAIN}"
+    ln -sf "$NGINX_SITE_FILE" "/etc/nginx/sites-enabled/${DOMAIN}"
     rm -f /etc/nginx/sites-enabled/default
     
     # Проверка и перезагрузка
@@ -81,29 +113,179 @@ EOF
     print_success "Настройка Nginx завершена"
 }
 
+# Location-блоки фронтенда: файлы выгруженной сборки отдаются с диска,
+# остальное (и все, если выгрузка отключена) проксируется в контейнер
+nginx_frontend_locations() {
+    local proxy_block
+    proxy_block=$(nginx_proxy_directives "$(nginx_upstream_name "$DOMAIN")")
+    
+    if [ "$FRONTEND_STATIC_EXPORT" != "yes" ]; then
+        cat << EOF
+    location / {
+$proxy_block
+    }
+EOF
+        return
+    fi
+    
+    cat << EOF
+    root $(frontend_static_dir)/current;
+    include $NGINX_STATIC_SETTINGS_FILE;
+
+    location / {
+        try_files \$uri \$uri/index.html @frontend;
+    }
+
+    # Ассеты сборки с хешем в имени
+    location ${FRONTEND_IMMUTABLE_PATH:-/assets/} {
+        try_files \$uri @frontend;
+        expires max;
+        add_header Cache-Control "public, immutable";
+    }
+
+    location @frontend {
+$proxy_block
+    }
+EOF
+}
+
+# Зона кеша и формат лога со статусом кеша (уровень http)
+nginx_backend_cache_zone() {
+    if ! nginx_cache_needed; then
+        return
+    fi
+    
+    cat << EOF
+
+proxy_cache_path $NGINX_CACHE_DIR levels=1:2 keys_zone=backend_cache:${BACKEND_CACHE_ZONE_SIZE:-10m} max_size=${BACKEND_CACHE_MAX_SIZE:-1g} inactive=${BACKEND_CACHE_INACTIVE:-60m} use_temp_path=off;
+log_format cache_status '\$upstream_cache_status \$status \$request_time "\$request_method \$uri" [\$time_local]';
+EOF
+}
+
+# Location-блоки бэкенда. С BACKEND_CACHE=yes GET-ответы кешируются:
+# BACKEND_CACHE_TTL по умолчанию, BACKEND_CACHE_LOCATIONS="/api/news/=5m ..." - свои TTL
+nginx_backend_locations() {
+    local proxy_block
+    proxy_block=$(nginx_proxy_directives "$(nginx_upstream_name "$BACKEND_DOMAIN")")
+    local item
+    
+    if [ "$BACKEND_CACHE" != "yes" ]; then
+        cat << EOF
+    location / {
+$proxy_block
+    }
+EOF
+        return
+    fi
+    
+    cat << EOF
+    access_log $(nginx_cache_log_file) cache_status;
+
+    location / {
+$proxy_block
+        include $NGINX_CACHE_SETTINGS_FILE;
+        proxy_cache_valid 200 301 302 ${BACKEND_CACHE_TTL:-1m};
+    }
+EOF
+    
+    for item in $BACKEND_CACHE_LOCATIONS; do
+        cat << EOF
+
+    location ${item%%=*} {
+$proxy_block
+        include $NGINX_CACHE_SETTINGS_FILE;
+        proxy_cache_valid 200 301 302 ${item#*=};
+    }
+EOF
+    done
+}
+
+# Доля попаданий в кеш по логу: cache-stats [домен] [строк с конца]
+show_cache_stats() {
+    load_config
+    
+    local domain="$BACKEND_DOMAIN"
+    local log_file
+    
+    if [ -n "$1" ] && ! [[ "$1" =~ ^[0-9]+$ ]]; then
+        domain="$1"
+        shift
+    fi
+    
+    local lines="${1:-100000}"
+    log_file=$(nginx_cache_log_file "$domain")
+    
+    if [ ! -f "$log_file" ]; then
+        print_error "Лог $log_file не найден. Кеш включается через BACKEND_CACHE=\"yes\" и setup-nginx."
+        return 1
+    fi
+    
+    print_step "СТАТИСТИКА КЕША $domain"
+    
+    tail -n "$lines" "$log_file" | awk '
+        {
+            status = $1
+            uri = $5; sub(/"$/, "", uri)
+            total++
+            count[status]++
+            requests[uri]++
+            # STALE/UPDATING/REVALIDATED тоже отданы без полного запроса к бэкенду
+            if (status == "HIT" || status == "STALE" || status == "UPDATING" || status == "REVALIDATED") {
+                hits++
+                uri_hits[uri]++
+            }
+            if (status != "-") cacheable++
+        }
+        END {
+            if (total == 0) { print "  Лог пуст"; exit }
+            printf "  Запросов: %d, кешируемых: %d\n", total, cacheable
+            for (s in count) printf "    %-12s %d\n", s, count[s]
+            if (cacheable > 0) printf "  Доля попаданий: %.1f%%\n", hits * 100 / cacheable
+            print ""
+            print "  Самые частые URI:"
+            n = 0
+            for (u in requests) order[++n] = u
+            for (i = 1; i <= n; i++)
+                for (j = i + 1; j <= n; j++)
+                    if (requests[order[j]] > requests[order[i]]) { t = order[i]; order[i] = order[j]; order[j] = t }
+            for (i = 1; i <= n && i <= 10; i++)
+                printf "    %6d  %5.1f%%  %s\n", requests[order[i]], uri_hits[order[i]] * 100 / requests[order[i]], order[i]
+        }
+    '
+}
+
 setup_maintenance_page() {
     print_step "НАСТРОЙКА СТРАНИЦЫ ТЕХНИЧЕСКИХ РАБОТ"
     
-    echo ""
-    print_info "Выберите тип страницы для технических работ:"
-    echo "  1) 📄 Использовать стандартную страницу"
-    echo "  2) 🎨 Создать новую кастомную страницу" 
-    echo "  3) 📂 Указать путь к существующему HTML файлу"
-    echo ""
+    # Выбор из MAINTENANCE_PAGE: default, custom или путь к HTML файлу
+    local choice="$MAINTENANCE_PAGE"
     
-    local choice
-    read -p "$(echo -e ${YELLOW}"Ваш выбор (1/2/3): "${NC})" choice
+    if [ -z "$choice" ]; then
+        require_interactive "Тип страницы технических работ" "MAINTENANCE_PAGE"
+        
+        echo ""
+        print_info "Выберите тип страницы для технических работ:"
+        echo "  1) 📄 Использовать стандартную страницу"
+        echo "  2) 🎨 Создать новую кастомную страницу" 
+        echo "  3) 📂 Указать путь к существующему HTML файлу"
+        echo ""
+        
+        read -p "$(echo -e ${YELLOW}"Ваш выбор (1/2/3): "${NC})" choice
+    fi
     
     case $choice in
-        1)
+        1|default)
             setup_default_maintenance_page
             ;;
-        2)
+        2|custom)
             setup_custom_maintenance_page
             ;;
         3)
             setup_existing_maintenance_page
             ;;
+        /*)
+            setup_existing_maintenance_page "$choice"
+            ;;
         *)
             print_warning "Неверный выбор. Используется стандартная страница."
             setup_default_maintenance_page
@@ -114,8 +296,12 @@ setup_maintenance_page() {
 setup_default_maintenance_page() {
     print_info "Настройка стандартной страницы технических работ..."
     
-    local support_email
-    if [ -z "$USER_EMAIL" ]; then
+    local support_email="$SUPPORT_EMAIL"
+    if [ -n "$support_email" ]; then
+        print_info "Email технической поддержки: $support_email"
+    elif [ "$NON_INTERACTIVE" = "yes" ]; then
+        support_email="$USER_EMAIL"
+    elif [ -z "$USER_EMAIL" ]; then
         read -p "$(echo -e ${YELLOW}"Введите email для технической поддержки: "${NC})" support_email
     else
         read -p "$(echo -e ${YELLOW}"Введите email для технической поддержки [по умолчанию: $USER_EMAIL]: "${NC})" support_email
@@ -428,8 +614,11 @@ EOF
 setup_existing_maintenance_page() {
     print_info "Использование существующего HTML файла..."
     
-    local html_path
-    read -p "$(echo -e ${YELLOW}"Введите полный путь к HTML файлу: "${NC})" html_path
+    local html_path="$1"
+    if [ -z "$html_path" ]; then
+        require_interactive "Путь к HTML файлу страницы технических работ" "MAINTENANCE_PAGE"
+        read -p "$(echo -e ${YELLOW}"Введите полный путь к HTML файлу: "${NC})" html_path
+    fi
     
     if [ -z "$html_path" ]; then
         print_warning "Путь не указан. Используется стандартная страница."
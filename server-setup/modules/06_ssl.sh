@@ -1,7 +1,12 @@
 #!/bin/bash
+# requires: 05_nginx_setup.sh
+# inputs: DOMAIN BACKEND_DOMAIN USER_EMAIL SITES SSL_*
 
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/helpers.sh"
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/config.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/sites.sh"
+
+SSL_TUNING_FILE="/etc/nginx/snippets/ssl-tuning.conf"
 
 setup_ssl() {
     print_step "6. НАСТРОЙКА SSL СЕРТИФИКАТОВ"
@@ -18,10 +23,21 @@ setup_ssl() {
         USER_EMAIL="pleromacorp@gmail.com"
     fi
     
-    print_info "Запрос SSL сертификатов для $DOMAIN и $BACKEND_DOMAIN..."
-    certbot --nginx -d "$DOMAIN" -d "$BACKEND_DOMAIN" --non-interactive --agree-tos --email "$USER_EMAIL" --redirect
+    # Один сертификат на основные домены и все сайты из SITES
+    local certbot_domains=(-d "$DOMAIN" -d "$BACKEND_DOMAIN")
+    local site
+    for site in $(site_domains); do
+        certbot_domains+=(-d "$site")
+    done
+    
+    print_info "Запрос SSL сертификатов для $DOMAIN, $BACKEND_DOMAIN$(site_domains | sed 's/^/, /' | tr -d '\n')..."
+    certbot --nginx "${certbot_domains[@]}" --non-interactive --agree-tos --email "$USER_EMAIL" --redirect
     check_success "SSL сертификаты получены" "Ошибка при получении SSL сертификатов"
     
+    print_info "Настройка HTTP/2 и параметров TLS..."
+    write_ssl_tuning && tune_ssl_server_blocks
+    check_success "Параметры TLS применены" "Ошибка при настройке параметров TLS"
+    
     print_info "Проверка автоматического продления сертификатов..."
     # Тест автоматического обновления
     certbot renew --dry-run
@@ -39,17 +55,155 @@ setup_ssl() {
     print_success "Настройка SSL завершена"
 }
 
+# Версия nginx: 1.18.0
+nginx_version() {
+    nginx -v 2>&1 | sed -n 's|.*nginx/\([0-9.]*\).*|\1|p'
+}
+
+# version_ge 1.25.1 1.25.0 -> истина
+version_ge() {
+    [ "$(printf '%s\n' "$1" "$2" | sort -V | head -n 1)" = "$2" ]
+}
+
+# Параметры TLS: настройки certbot без его сессионных директив + кеш сессий,
+# session tickets и OCSP stapling
+write_ssl_tuning() {
+    local certbot_options="/etc/letsencrypt/options-ssl-nginx.conf"
+    
+    mkdir -p "$(dirname "$SSL_TUNING_FILE")"
+    
+    {
+        grep -vE '^[[:space:]]*ssl_session_(cache|timeout|tickets)' "$certbot_options" 2>/dev/null
+        cat << EOF
+
+ssl_session_cache shared:SSL:${SSL_SESSION_CACHE_SIZE:-10m};
+ssl_session_timeout ${SSL_SESSION_TIMEOUT:-1d};
+ssl_session_tickets ${SSL_SESSION_TICKETS:-on};
+
+ssl_stapling on;
+ssl_stapling_verify on;
+ssl_trusted_certificate /etc/letsencrypt/live/$DOMAIN/chain.pem;
+resolver ${SSL_RESOLVER:-1.1.1.1 8.8.8.8} valid=300s;
+resolver_timeout 5s;
+EOF
+    } > "$SSL_TUNING_FILE"
+}
+
+# Доработка server-блоков, созданных certbot: http2, QUIC (если nginx собран
+# с http_v3) и свои параметры TLS вместо options-ssl-nginx.conf.
+# Строки прошлой доработки (# managed by server-setup) сначала убираются,
+# поэтому изменение SSL_HTTP3 применяется при повторном запуске
+tune_ssl_server_blocks() {
+    local site_file="/etc/nginx/sites-available/${DOMAIN}"
+    local version
+    local modern=0
+    local quic=0
+    
+    version=$(nginx_version)
+    
+    # С 1.25.1 http2 включается отдельной директивой, а не в listen
+    if version_ge "$version" "1.25.1"; then
+        modern=1
+    fi
+    
+    if [ "$SSL_HTTP3" = "yes" ] && nginx -V 2>&1 | grep -q "http_v3_module"; then
+        quic=1
+    elif [ "$SSL_HTTP3" = "yes" ]; then
+        print_warning "nginx $version собран без http_v3_module, HTTP/3 не включен"
+    fi
+    
+    cp -f "$site_file" "${site_file}.bak"
+    
+    awk -v tuning="$SSL_TUNING_FILE" '
+        /# managed by server-setup/ && /(http2 on;|listen 443 quic|Alt-Svc)/ { next }
+        /# managed by server-setup/ && index($0, tuning) {
+            sub(tuning, "/etc/letsencrypt/options-ssl-nginx.conf")
+            sub(/# managed by server-setup/, "# managed by Certbot")
+        }
+        { print }
+    ' "${site_file}.bak" | awk -v modern="$modern" -v quic="$quic" '
+        /include \/etc\/letsencrypt\/options-ssl-nginx.conf;/ {
+            sub(/\/etc\/letsencrypt\/options-ssl-nginx.conf/, "'"$SSL_TUNING_FILE"'")
+            sub(/# managed by Certbot/, "# managed by server-setup")
+            print
+            next
+        }
+        /listen (\[::\]:)?443 ssl/ {
+            if (!modern && $0 !~ /http2/) sub(/443 ssl/, "443 ssl http2")
+            print
+            if ($0 ~ /listen 443 ssl/) {
+                if (modern) print "    http2 on; # managed by server-setup"
+                if (quic) {
+                    # reuseport допускается только один раз на адрес
+                    print "    listen 443 quic" (reuseport_done ? "" : " reuseport") "; # managed by server-setup"
+                    reuseport_done = 1
+                    print "    add_header Alt-Svc '\''h3=\":443\"; ma=86400'\'' always; # managed by server-setup"
+                }
+            }
+            next
+        }
+        { print }
+    ' > "$site_file"
+    
+    if ! nginx -t > /dev/null 2>&1; then
+        print_error "Ошибка в доработанной конфигурации, возвращаем исходную"
+        mv -f "${site_file}.bak" "$site_file"
+        return 1
+    fi
+    
+    if [ "$quic" -eq 1 ]; then
+        ufw allow 443/udp > /dev/null
+    else
+        ufw delete allow 443/udp > /dev/null 2>&1
+    fi
+    
+    print_success "Включено: http2$([ "$quic" -eq 1 ] && echo ", HTTP/3"), кеш сессий TLS, OCSP stapling"
+}
+
+# Среднее время TLS-рукопожатия (мс) за SSL_BENCH_SECONDS: new - полное, reuse - с возобновлением сессии
+measure_handshake() {
+    local domain="$1"
+    local mode="$2"
+    local seconds="${SSL_BENCH_SECONDS:-3}"
+    local connections
+    
+    connections=$(openssl s_time -connect "$domain:443" -"$mode" -time "$seconds" 2>/dev/null | \
+        awk '/connections in .* real seconds/ { print $1; exit }')
+    
+    if [ -z "$connections" ] || [ "$connections" -eq 0 ]; then
+        echo "-"
+        return
+    fi
+    
+    awk -v s="$seconds" -v n="$connections" 'BEGIN { printf "%.1f", s * 1000 / n }'
+}
+
 # Функция для проверки SSL
 check_ssl() {
+    load_config
+    
     print_info "Проверка SSL сертификатов..."
     
-    local domains=("$DOMAIN" "$BACKEND_DOMAIN")
+    local domains=("$DOMAIN" "$BACKEND_DOMAIN" $(site_domains))
     for domain in "${domains[@]}"; do
         print_info "Проверка $domain..."
         if openssl s_client -connect "$domain:443" -servername "$domain" < /dev/null 2>/dev/null | openssl x509 -noout -dates; then
             print_success "SSL для $domain работает корректно"
         else
             print_error "Проблема с SSL для $domain"
+            continue
+        fi
+        
+        # Возобновление сессии: s_client переподключается 5 раз с тем же session id/ticket
+        local reused
+        reused=$(openssl s_client -connect "$domain:443" -servername "$domain" -reconnect < /dev/null 2>/dev/null | grep -c "^Reused")
+        
+        print_info "Рукопожатие $domain: полное $(measure_handshake "$domain" new) мс, с возобновлением $(measure_handshake "$domain" reuse) мс (возобновлено $reused из 5)"
+        
+        if curl -s -o /dev/null --http2 -w '%{http_version}' "https://$domain/" 2>/dev/null | grep -q "^2"; then
+            print_success "HTTP/2 для $domain включен"
+        else
+            print_warning "HTTP/2 для $domain не согласован"
         fi
     done
 }
\ No newline at end of file
@@ -1,4 +1,7 @@
 #!/bin/bash
+# requires: 02_packages.sh
+# interactive: yes
+# inputs: USER_EMAIL SSH_SHOW_KEY
 
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/helpers.sh"
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/config.sh"
@@ -6,6 +9,8 @@ source "$(dirname "${BASH_SOURCE[0]}")/../lib/config.sh"
 setup_ssh_git() {
     print_step "7. НАСТРОЙКА SSH И GIT"
     
+    load_config
+    
     # Создание папки .ssh если не существует
     mkdir -p ~/.ssh
     chmod 700 ~/.ssh
@@ -13,7 +18,7 @@ setup_ssh_git() {
     # Проверка существующего SSH ключа
     if [ -f ~/.ssh/id_rsa.pub ]; then
         print_info "Найден существующий SSH ключ"
-        if confirm_action "Показать публичный SSH ключ?"; then
+        if confirm_action "Показать публичный SSH ключ?" "SSH_SHOW_KEY"; then
             print_warning "=== Публичный ключ ==="
             cat ~/.ssh/id_rsa.pub
             print_warning "=== Конец публичного ключа ==="
@@ -39,7 +44,9 @@ setup_ssh_git() {
         print_warning "GitHub → Settings → SSH and GPG keys → New SSH key"
         echo ""
         
-        if confirm_action "Нажмите Y после добавления ключа в GitHub"; then
+        if [ "$NON_INTERACTIVE" = "yes" ]; then
+            print_warning "Неинтерактивный режим: ключ должен быть добавлен в GitHub до настройки репозитория"
+        elif confirm_action "Нажмите Y после добавления ключа в GitHub"; then
             print_success "SSH ключ настроен"
         else
             print_warning "Не забудьте добавить SSH ключ в GitHub позже"
@@ -1,4 +1,7 @@
 #!/bin/bash
+# requires: 07_ssh_git.sh
+# interactive: yes
+# inputs: REPO_URL REPO_PULL ENV_EDIT
 
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/helpers.sh"
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/config.sh"
@@ -27,7 +30,7 @@ setup_repository() {
     if [ -d "$PROJECT_DIR" ]; then
         print_warning "Репощиторий уже существует в $PROJECT_DIR"
         
-        if confirm_action "Хотите обновить репозиторий (git pull)?"; then
+        if confirm_action "Хотите обновить репозиторий (git pull)?" "REPO_PULL"; then
             print_info "Обновление репозитория..."
             cd "$PROJECT_DIR"
             git pull
@@ -96,7 +99,7 @@ setup_env_file() {
         echo ""
     fi
     
-    if confirm_action "Хотите отредактировать файл .env?"; then
+    if confirm_action "Хотите отредактировать файл .env?" "ENV_EDIT"; then
         if command -v nano >/dev/null 2>&1; then
             nano "$ENV_FILE"
         elif command -v vim >/dev/null 2>&1; then
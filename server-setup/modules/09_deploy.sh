@@ -1,7 +1,15 @@
 #!/bin/bash
+# requires: 04_docker.sh 05_nginx_setup.sh 06_ssl.sh 08_repo_setup.sh
+# interactive: yes
+# checkpoint: no
 
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/helpers.sh"
 source "$(dirname "${BASH_SOURCE[0]}")/../lib/config.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/nginx.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/build.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/release.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/static.sh"
+source "$(dirname "${BASH_SOURCE[0]}")/../lib/bench.sh"
 
 deploy_app() {
     print_step "9. ДЕПЛОЙ ПРИЛОЖЕНИЯ"
@@ -33,36 +41,66 @@ deploy_app() {
     # Проверяем .env файл
     if [ ! -f ".env" ]; then
         print_warning "Файл .env не найден. Запустите настройку переменных окружения."
-        if confirm_action "Хотите создать .env файл сейчас?"; then
+        if confirm_action "Хотите создать .env файл сейчас?" "ENV_CREATE"; then
             touch .env
             print_success "Файл .env создан"
             print_warning "Не забудьте настроить переменные окружения перед запуском"
         fi
     fi
     
+    if [ "$DEPLOY_STRATEGY" = "blue-green" ]; then
+        deploy_blue_green
+        return $?
+    fi
+    
     # Остановка существующих контейнеров
     print_info "Остановка существующих контейнеров..."
     docker-compose down
     check_success "Контейнеры остановлены" "Ошибка при остановке контейнеров"
     
     # Обновление репозитория
+    local previous_sha
+    local previous_release
+    previous_sha=$(git rev-parse HEAD)
+    previous_release=$(current_release)
+    
     print_info "Обновление кода из репозитория..."
+    return_to_branch
     git pull
     check_success "Код обновлен" "Ошибка при обновлении кода"
     
     # Сборка образов
     print_info "Сборка Docker образов..."
-    docker-compose build --no-cache
+    build_images
     check_success "Docker образы собраны" "Ошибка при сборке Docker образов"
+    record_deployed_sha
     
     # Запуск контейнеров
     print_info "Запуск Docker контейнеров..."
     docker-compose up -d
     check_success "Docker контейнеры запущены" "Ошибка при запуске Docker контейнеров"
     
-    # Мониторинг запуска
-    print_info "Мониторинг запуска контейнеров..."
-    sleep 10
+    # Ожидание готовности
+    print_info "Ожидание готовности контейнеров..."
+    color_ports "blue"
+    if ! wait_for_ready "" "$COLOR_FRONTEND_PORT" "$COLOR_BACKEND_PORT"; then
+        print_readiness_report
+        docker-compose logs --tail=20
+        if [ -n "$previous_release" ]; then
+            print_warning "Стек не готов, возврат к релизу $previous_release..."
+            start_release "$previous_release"
+            print_error "Деплой не удался, восстановлен релиз $previous_release"
+        else
+            rollback_to_sha "$previous_sha"
+        fi
+        return 1
+    fi
+    print_readiness_report
+    create_release
+    
+    if export_frontend_static; then
+        systemctl reload nginx
+    fi
     
     # Проверка статуса контейнеров
     print_info "Статус контейнеров:"
@@ -79,21 +117,303 @@ deploy_app() {
     print_success "Деплой завершен успешно!"
 }
 
-# Функция для проверки здоровья приложения
+# Имя compose-проекта для стека заданного цвета
+stack_project_name() {
+    echo "$(basename "$PROJECT_DIR")-$1"
+}
+
+# Активный цвет стека. Пустая строка - стек запущен обычным деплоем
+get_active_color() {
+    cat "$STATE_DIR/active_color" 2>/dev/null
+}
+
+# docker-compose для стека заданного цвета (пустой цвет - проект по умолчанию).
+# Порты стека передаются в docker-compose.yml через окружение только этой команды,
+# базовые FRONTEND_PORT/BACKEND_PORT не меняются
+stack_compose() {
+    local color="$1"
+    shift
+
+    if [ -n "$color" ]; then
+        (
+            color_ports "$color"
+            FRONTEND_PORT="$COLOR_FRONTEND_PORT" BACKEND_PORT="$COLOR_BACKEND_PORT" \
+                docker-compose -p "$(stack_project_name "$color")" "$@"
+        )
+    else
+        docker-compose "$@"
+    fi
+}
+
+# Время до готовности по проверкам (мс) и их итог, заполняются wait_for_ready
+declare -gA READY_TIMES
+declare -gA READY_STATUS
+
+now_ms() {
+    date +%s%3N
+}
+
+# Таймаут готовности проверки: READY_TIMEOUTS="backend=180 frontend=60", иначе READY_TIMEOUT
+ready_timeout() {
+    local name="${1#docker:}"
+    local item
+
+    for item in $READY_TIMEOUTS; do
+        if [ "${item%%=*}" = "$name" ]; then
+            echo "${item#*=}"
+            return
+        fi
+    done
+
+    echo "${READY_TIMEOUT:-120}"
+}
+
+# Состояние одной проверки: ready | pending | failed
+probe_ready() {
+    local kind="$1"
+    local target="$2"
+    local url
+    local code
+    local status
+
+    case "$kind" in
+        http)
+            # Готов - любой ответ ниже 500: API без /health/ может отвечать 404 на /
+            for url in $target; do
+                code=$(curl -s -o /dev/null -w '%{http_code}' --max-time 5 "$url")
+                if [ "${code:-0}" -gt 0 ] && [ "$code" -lt 500 ]; then
+                    echo "ready"
+                    return
+                fi
+            done
+            echo "pending"
+            ;;
+        docker)
+            # Healthcheck из образа/compose, если задан, иначе статус контейнера.
+            # Одноразовые сервисы (миграции, collectstatic) завершаются с кодом 0
+            status=$(docker inspect -f '{{if .State.Health}}{{.State.Health.Status}}{{else}}{{.State.Status}}:{{.State.ExitCode}}{{end}}' "$target" 2>/dev/null)
+            case "$status" in
+                healthy|running:*|exited:0) echo "ready" ;;
+                unhealthy|exited:*|dead:*) echo "failed" ;;
+                *) echo "pending" ;;
+            esac
+            ;;
+    esac
+}
+
+# Ожидание готовности стека с экспоненциальной задержкой между опросами.
+# Проверяются HTTP-порты фронтенда и бэкенда и Docker-статус каждого контейнера.
+wait_for_ready() {
+    local color="$1"
+    local frontend_port="$2"
+    local backend_port="$3"
+    local names=(backend frontend)
+    local kinds=(http http)
+    local targets=("http://localhost:$backend_port/health/ http://localhost:$backend_port/" "http://localhost:$frontend_port/")
+    local delay=1
+    local max_delay="${READY_MAX_DELAY:-8}"
+    local start
+    local elapsed
+    local failed=0
+    local id service i state
+    local pending=()
+    local still_pending
+
+    while read -r id; do
+        [ -z "$id" ] && continue
+        service=$(docker inspect -f '{{index .Config.Labels "com.docker.compose.service"}}' "$id" 2>/dev/null)
+        names+=("docker:${service:-$id}")
+        kinds+=(docker)
+        targets+=("$id")
+    done < <(stack_compose "$color" ps -q 2>/dev/null)
+
+    READY_TIMES=()
+    READY_STATUS=()
+    for i in "${!names[@]}"; do
+        pending+=("$i")
+        READY_STATUS[${names[$i]}]="pending"
+    done
+
+    start=$(now_ms)
+
+    while [ "${#pending[@]}" -gt 0 ]; do
+        still_pending=()
+
+        for i in "${pending[@]}"; do
+            state=$(probe_ready "${kinds[$i]}" "${targets[$i]}")
+            elapsed=$(( $(now_ms) - start ))
+
+            if [ "$state" = "ready" ]; then
+                READY_TIMES[${names[$i]}]="$elapsed"
+                READY_STATUS[${names[$i]}]="ready"
+                print_success "${names[$i]} готов за $((elapsed / 1000)).$(printf '%03d' $((elapsed % 1000))) с"
+            elif [ "$state" = "failed" ]; then
+                READY_STATUS[${names[$i]}]="failed"
+                print_error "${names[$i]}: контейнер остановлен или unhealthy"
+                failed=1
+            elif [ "$elapsed" -ge $(( $(ready_timeout "${names[$i]}") * 1000 )) ]; then
+                READY_STATUS[${names[$i]}]="timeout"
+                print_error "${names[$i]}: не готов за $(ready_timeout "${names[$i]}") с"
+                failed=1
+            else
+                still_pending+=("$i")
+            fi
+        done
+
+        if [ "$failed" -eq 1 ]; then
+            return 1
+        fi
+
+        pending=("${still_pending[@]}")
+
+        if [ "${#pending[@]}" -gt 0 ]; then
+            sleep "$delay"
+            delay=$((delay * 2))
+            if [ "$delay" -gt "$max_delay" ]; then
+                delay="$max_delay"
+            fi
+        fi
+    done
+
+    return 0
+}
+
+# Итоги готовности: таблица в консоль и JSON в STATE_DIR/readiness.json
+print_readiness_report() {
+    local name
+    local first=1
+
+    print_info "Готовность сервисов:"
+    for name in "${!READY_STATUS[@]}"; do
+        if [ -n "${READY_TIMES[$name]}" ]; then
+            printf "  %-24s %-8s %6d мс\n" "$name" "${READY_STATUS[$name]}" "${READY_TIMES[$name]}"
+        else
+            printf "  %-24s %-8s %9s\n" "$name" "${READY_STATUS[$name]}" "-"
+        fi
+    done
+
+    mkdir -p "$STATE_DIR"
+    {
+        echo "{"
+        for name in "${!READY_STATUS[@]}"; do
+            [ "$first" -eq 0 ] && echo ","
+            first=0
+            printf '  "%s": {"status": "%s", "time_to_ready_ms": %s}' \
+                "$name" "${READY_STATUS[$name]}" "${READY_TIMES[$name]:-null}"
+        done
+        echo ""
+        echo "}"
+    } > "$STATE_DIR/readiness.json"
+}
+
+# Деплой без простоя: новый стек поднимается на соседних портах,
+# nginx переключается на него только после проверки здоровья.
+# С id релиза стек поднимается из его образов без git pull и сборки (откат)
+deploy_blue_green() {
+    local release_id="$1"
+    local active_color
+    local target_color
+    local frontend_port
+    local backend_port
+    active_color=$(get_active_color)
+
+    if [ "$active_color" = "green" ]; then
+        target_color="blue"
+    else
+        target_color="green"
+    fi
+
+    print_info "Blue/green деплой: активный стек ${active_color:-по умолчанию}, новый стек $target_color"
+
+    # Порты нового стека (в docker-compose.yml их передает stack_compose)
+    color_ports "$target_color"
+    frontend_port="$COLOR_FRONTEND_PORT"
+    backend_port="$COLOR_BACKEND_PORT"
+
+    if [ -n "$release_id" ]; then
+        print_info "Образы релиза $release_id для стека $target_color..."
+        restore_release "$release_id" "$target_color" || return 1
+        echo "$(release_sha "$release_id")" > "$(deployed_sha_file "$target_color")"
+    else
+        # Обновление репозитория
+        print_info "Обновление кода из репозитория..."
+        return_to_branch
+        git pull
+        check_success "Код обновлен" "Ошибка при обновлении кода"
+
+        # Сборка образов, старый стек продолжает обслуживать запросы
+        print_info "Сборка Docker образов ($target_color)..."
+        build_images "$target_color"
+        check_success "Docker образы собраны" "Ошибка при сборке Docker образов"
+        record_deployed_sha "$target_color"
+    fi
+
+    print_info "Запуск стека $target_color на портах $frontend_port/$backend_port..."
+    stack_compose "$target_color" up -d
+    check_success "Стек $target_color запущен" "Ошибка при запуске стека $target_color"
+
+    print_info "Ожидание готовности стека $target_color..."
+    if ! wait_for_ready "$target_color" "$frontend_port" "$backend_port"; then
+        print_readiness_report
+        print_error "Стек $target_color не прошел проверку готовности"
+        stack_compose "$target_color" logs --tail=20
+        stack_compose "$target_color" down
+        print_warning "Трафик остался на предыдущем стеке"
+        return 1
+    fi
+    print_readiness_report
+    print_success "Стек $target_color готов"
+
+    # Перезагрузка nginx при переключении upstream подхватит и новую статику
+    export_frontend_static "$target_color"
+
+    print_info "Переключение nginx на стек $target_color..."
+    if ! switch_nginx_upstreams "$frontend_port" "$backend_port"; then
+        stack_compose "$target_color" down
+        return 1
+    fi
+    print_success "Nginx переключен на стек $target_color"
+
+    mkdir -p "$STATE_DIR"
+    echo "$target_color" > "$STATE_DIR/active_color"
+
+    if [ -n "$release_id" ]; then
+        record_release_entry "$release_id" "$(release_sha "$release_id")"
+    else
+        create_release "$target_color"
+    fi
+
+    print_info "Остановка предыдущего стека..."
+    stack_compose "$active_color" down
+    check_success "Предыдущий стек остановлен" "Ошибка при остановке предыдущего стека"
+
+    check_application_health "$frontend_port" "$backend_port"
+
+    print_success "Деплой завершен успешно!"
+}
+
+# Функция для проверки здоровья приложения: check_application_health [порт_фронтенда порт_бэкенда]
 check_application_health() {
     print_info "Проверка здоровья приложения..."
     
+    # Порты активного стека, если не переданы
+    color_ports "$(cat "$STATE_DIR/active_color" 2>/dev/null || echo "blue")"
+    if [ -n "$1" ] && [ -n "$2" ]; then
+        COLOR_FRONTEND_PORT="$1"
+        COLOR_BACKEND_PORT="$2"
+    fi
+    
     # Проверка бэкенда
-    if curl -f -s "http://localhost:8000/health/" > /dev/null 2>&1 || \
-       curl -f -s "http://localhost:8000/" > /dev/null 2>&1; then
-        print_success "Бэкенд доступен на localhost:8000"
+    if curl -f -s "http://localhost:$COLOR_BACKEND_PORT/health/" > /dev/null 2>&1 || \
+       curl -f -s "http://localhost:$COLOR_BACKEND_PORT/" > /dev/null 2>&1; then
+        print_success "Бэкенд доступен на localhost:$COLOR_BACKEND_PORT"
     else
         print_warning "Бэкенд может быть недоступен. Проверьте логи: docker-compose logs"
     fi
     
     # Проверка фронтенда
-    if curl -f -s "http://localhost:8080/" > /dev/null 2>&1; then
-        print_success "Фронтенд доступен на localhost:8080"
+    if curl -f -s "http://localhost:$COLOR_FRONTEND_PORT/" > /dev/null 2>&1; then
+        print_success "Фронтенд доступен на localhost:$COLOR_FRONTEND_PORT"
     else
         print_warning "Фронтенд может быть недоступен. Проверьте логи: docker-compose logs"
     fi
@@ -109,7 +429,70 @@ check_application_health() {
     fi
 }
 
-# Функция для отката деплоя
+# Замер задержек эндпоинтов: health-check --bench [-n N] [-c C] [-o FILE]
+bench_application_health() {
+    load_config
+    
+    local requests="${BENCH_REQUESTS:-50}"
+    local concurrency="${BENCH_CONCURRENCY:-10}"
+    local output=""
+    local endpoints=()
+    
+    while [ $# -gt 0 ]; do
+        case "$1" in
+            -n|--requests)
+                requests="$2"
+                shift 2
+                ;;
+            -c|--concurrency)
+                concurrency="$2"
+                shift 2
+                ;;
+            -o|--output)
+                output="$2"
+                shift 2
+                ;;
+            *)
+                print_error "Неизвестный параметр: $1"
+                return 1
+                ;;
+        esac
+    done
+    
+    PROJECT_DIR="/root/$(basename "$REPO_URL" .git)"
+    
+    if [ -n "$HEALTH_ENDPOINTS" ]; then
+        read -r -a endpoints <<< "$HEALTH_ENDPOINTS"
+    else
+        # Порты активного стека и оба домена
+        color_ports "$(cat "$STATE_DIR/active_color" 2>/dev/null || echo "blue")"
+        endpoints=("http://localhost:$COLOR_BACKEND_PORT/" "http://localhost:$COLOR_FRONTEND_PORT/")
+        [ -n "$DOMAIN" ] && endpoints+=("https://$DOMAIN/")
+        [ -n "$BACKEND_DOMAIN" ] && endpoints+=("https://$BACKEND_DOMAIN/")
+    fi
+    
+    if [ -z "$output" ]; then
+        output="$STATE_DIR/bench/$(date +%Y%m%d-%H%M%S).json"
+    fi
+    
+    run_bench "$requests" "$concurrency" "$output" "${endpoints[@]}"
+}
+
+# Запуск стека из образов релиза (recreate): перетегирование и up -d без сборки
+start_release() {
+    local release_id="$1"
+    
+    restore_release "$release_id" || return 1
+    
+    docker-compose up -d
+    check_success "Контейнеры релиза $release_id запущены" "Ошибка при запуске контейнеров"
+    
+    mkdir -p "$STATE_DIR"
+    echo "$(release_sha "$release_id")" > "$(deployed_sha_file)"
+    record_release_entry "$release_id" "$(release_sha "$release_id")"
+}
+
+# Функция для отката деплоя: rollback [id релиза], по умолчанию - предыдущий релиз
 rollback_deploy() {
     print_step "ОТКАТ ДЕПЛОЯ"
     
@@ -124,16 +507,98 @@ rollback_deploy() {
     
     cd "$PROJECT_DIR"
     
-    print_info "Откат к предыдущей версии..."
-    git reset --hard HEAD~1
-    check_success "Откат версии выполнен" "Ошибка при откате версии"
+    local release_id="${1:-$(previous_release)}"
+    
+    if [ -z "$release_id" ]; then
+        print_error "Нет предыдущего релиза для отката"
+        list_releases
+        return 1
+    fi
+    
+    if ! release_exists "$release_id"; then
+        print_error "Релиз $release_id не найден"
+        list_releases
+        return 1
+    fi
+    
+    if [ "$DEPLOY_STRATEGY" = "blue-green" ]; then
+        deploy_blue_green "$release_id"
+        return $?
+    fi
+    
+    print_info "Откат к релизу $release_id..."
+    start_release "$release_id" || return 1
+    
+    color_ports "blue"
+    if ! wait_for_ready "" "$COLOR_FRONTEND_PORT" "$COLOR_BACKEND_PORT"; then
+        print_readiness_report
+        print_error "Релиз $release_id не прошел проверку готовности"
+        return 1
+    fi
+    print_readiness_report
+    
+    if export_frontend_static; then
+        systemctl reload nginx
+    fi
+    
+    print_success "Откат к релизу $release_id завершен"
+}
+
+# Функция для просмотра истории релизов
+show_releases() {
+    load_config
+    list_releases
+}
+
+# Автоматический откат после неудачного деплоя: возврат к предыдущему коммиту,
+# пересборка измененных сервисов и перезапуск.
+# Используется git checkout, а не reset --hard: локальные изменения на сервере
+# не теряются, при конфликте откат кода не выполняется
+rollback_to_sha() {
+    local sha="$1"
+    local branch
+    
+    print_warning "Стек не готов, откат к $sha..."
+    branch=$(git symbolic-ref --short -q HEAD)
+    
+    if ! git checkout -q "$sha"; then
+        print_error "Не удалось переключиться на $sha (локальные изменения?), код не откатан"
+        print_warning "Проверьте git status в $PROJECT_DIR и запустите деплой повторно"
+        return 1
+    fi
+    print_success "Код возвращен к $sha"
+    
+    # Следующий деплой вернется на ветку перед git pull
+    if [ -n "$branch" ]; then
+        mkdir -p "$STATE_DIR"
+        echo "$branch" > "$STATE_DIR/rollback_branch"
+        print_warning "Репозиторий на коммите $sha вне ветки $branch до следующего деплоя"
+    fi
+    
+    build_images
+    check_success "Docker образы собраны" "Ошибка при сборке Docker образов"
+    record_deployed_sha
     
-    print_info "Перезапуск контейнеров..."
-    docker-compose down
     docker-compose up -d
-    check_success "Контейнеры перезапущены" "Ошибка при перезапуске контейнеров"
+    check_success "Предыдущая версия запущена" "Ошибка при запуске предыдущей версии"
+    
+    print_error "Деплой не удался, восстановлена предыдущая версия"
+}
+
+# Возврат на ветку после автоматического отката, чтобы git pull работал
+return_to_branch() {
+    local branch
+    
+    branch=$(cat "$STATE_DIR/rollback_branch" 2>/dev/null)
+    [ -n "$branch" ] || return 0
+    
+    if git symbolic-ref -q HEAD > /dev/null; then
+        rm -f "$STATE_DIR/rollback_branch"
+        return 0
+    fi
     
-    print_success "Откат завершен"
+    print_info "Возврат на ветку $branch после отката..."
+    git checkout -q "$branch" && rm -f "$STATE_DIR/rollback_branch"
 }
 
 # Функция для просмотра логов
@@ -0,0 +1,90 @@
+#!/bin/bash
+
+# Тестовый парк серверов для fleet: контейнеры Ubuntu с sshd на портах 2201, 2202, ...
+# Доступ по ключу ~/.ssh/id_rsa.pub, инвентарь пишется в файл.
+# systemd в контейнерах нет, поэтому full-setup целиком не пройдет - стенд нужен
+# для проверки копирования, параллелизма и сводки (help, releases, health-check).
+#
+# Использование:
+#   tools/fleet-sandbox.sh up [серверов] [инвентарь]
+#   tools/fleet-sandbox.sh down
+#   ./setup.sh fleet -j 4 fleet-sandbox.inventory help
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/../lib/colors.sh"
+
+PREFIX="fleet-sandbox"
+FIRST_PORT=2201
+IMAGE="ubuntu:22.04"
+
+sandbox_up() {
+    local count="${1:-3}"
+    local inventory="${2:-fleet-sandbox.inventory}"
+    local key="$HOME/.ssh/id_rsa.pub"
+    local i port
+
+    if ! command -v docker > /dev/null 2>&1; then
+        print_error "Docker не установлен"
+        exit 1
+    fi
+
+    if [ ! -f "$key" ]; then
+        print_error "Нет ключа $key (ssh-keygen -t rsa -b 4096)"
+        exit 1
+    fi
+
+    : > "$inventory"
+
+    for i in $(seq 1 "$count"); do
+        port=$((FIRST_PORT + i - 1))
+        print_info "Запуск $PREFIX-$i на порту $port..."
+
+        docker run -d --name "$PREFIX-$i" -p "127.0.0.1:$port:22" "$IMAGE" bash -c "
+            apt-get update -qq && apt-get install -y -qq openssh-server > /dev/null &&
+            mkdir -p /run/sshd /root/.ssh &&
+            echo '$(cat "$key")' > /root/.ssh/authorized_keys &&
+            chmod 600 /root/.ssh/authorized_keys &&
+            exec /usr/sbin/sshd -D" > /dev/null
+        check_started $? "$PREFIX-$i"
+
+        echo "root@127.0.0.1 port=$port name=$PREFIX-$i" >> "$inventory"
+    done
+
+    print_info "Ожидание sshd..."
+    for i in $(seq 1 "$count"); do
+        port=$((FIRST_PORT + i - 1))
+        until ssh -o BatchMode=yes -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null \
+            -p "$port" root@127.0.0.1 true 2> /dev/null; do
+            sleep 2
+        done
+    done
+
+    print_success "Серверов: $count, инвентарь: $inventory"
+    print_warning "Ключи хостов меняются при каждом запуске, для стенда задайте"
+    print_warning "FLEET_SSH_OPTIONS=\"-o BatchMode=yes -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null\""
+}
+
+check_started() {
+    if [ "$1" -ne 0 ]; then
+        print_error "Не удалось запустить $2"
+        exit 1
+    fi
+}
+
+sandbox_down() {
+    docker ps -aq --filter "name=^$PREFIX-" | xargs -r docker rm -f > /dev/null
+    print_success "Контейнеры $PREFIX-* удалены"
+}
+
+case "$1" in
+    up)
+        sandbox_up "$2" "$3"
+        ;;
+    down)
+        sandbox_down
+        ;;
+    *)
+        echo "Использование: $0 up [серверов] [инвентарь] | down"
+        exit 1
+        ;;
+esac
\ No newline at end of file
@@ -0,0 +1,148 @@
+#!/bin/bash
+
+# Сравнение пропускной способности nginx без keepalive к upstream и с ним.
+# Поднимает локальную заглушку бэкенда и временный nginx с двумя server-блоками,
+# затем гоняет wrk (или ab) по обоим. Root не нужен.
+#
+# Использование: tools/nginx-keepalive-bench.sh [секунд] [соединений]
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPT_DIR/../lib/colors.sh"
+source "$SCRIPT_DIR/../lib/config.sh"
+
+DURATION="${1:-10}"
+CONNECTIONS="${2:-64}"
+STUB_PORT=18900
+PLAIN_PORT=18901
+POOLED_PORT=18902
+
+if ! command -v nginx > /dev/null 2>&1; then
+    print_error "nginx не установлен"
+    exit 1
+fi
+
+if ! command -v wrk > /dev/null 2>&1 && ! command -v ab > /dev/null 2>&1; then
+    print_error "Нужен wrk или ab (apache2-utils)"
+    exit 1
+fi
+
+WORK_DIR=$(mktemp -d)
+STUB_PID=""
+
+cleanup() {
+    [ -f "$WORK_DIR/nginx.pid" ] && kill "$(cat "$WORK_DIR/nginx.pid")" 2>/dev/null
+    [ -n "$STUB_PID" ] && kill "$STUB_PID" 2>/dev/null
+    rm -rf "$WORK_DIR"
+}
+trap cleanup EXIT
+
+# Заглушка бэкенда: HTTP/1.1 с keepalive, небольшой JSON-ответ
+python3 - "$STUB_PORT" << 'EOF' &
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BODY = b'{"status": "ok"}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+ThreadingHTTPServer.daemon_threads = True
+ThreadingHTTPServer(("127.0.0.1", int(sys.argv[1])), Handler).serve_forever()
+EOF
+STUB_PID=$!
+
+mkdir -p "$WORK_DIR/temp"
+cat > "$WORK_DIR/nginx.conf" << EOF
+worker_processes auto;
+pid $WORK_DIR/nginx.pid;
+error_log $WORK_DIR/error.log;
+
+events {
+    worker_connections ${NGINX_WORKER_CONNECTIONS:-4096};
+}
+
+http {
+    access_log off;
+    client_body_temp_path $WORK_DIR/temp/body;
+    proxy_temp_path $WORK_DIR/temp/proxy;
+    fastcgi_temp_path $WORK_DIR/temp/fastcgi;
+    uwsgi_temp_path $WORK_DIR/temp/uwsgi;
+    scgi_temp_path $WORK_DIR/temp/scgi;
+
+    upstream plain {
+        server 127.0.0.1:$STUB_PORT;
+    }
+
+    upstream pooled {
+        server 127.0.0.1:$STUB_PORT;
+        keepalive ${NGINX_UPSTREAM_KEEPALIVE:-32};
+    }
+
+    # Как было: новое TCP-соединение к бэкенду на каждый запрос
+    server {
+        listen 127.0.0.1:$PLAIN_PORT;
+        location / {
+            proxy_pass http://plain;
+        }
+    }
+
+    # Как генерирует setup_nginx: пул соединений к upstream
+    server {
+        listen 127.0.0.1:$POOLED_PORT;
+        location / {
+            proxy_pass http://pooled;
+            proxy_http_version 1.1;
+            proxy_set_header Connection "";
+            proxy_buffer_size ${NGINX_PROXY_BUFFER_SIZE:-16k};
+            proxy_buffers ${NGINX_PROXY_BUFFERS:-8 32k};
+        }
+    }
+}
+EOF
+
+nginx -p "$WORK_DIR" -c "$WORK_DIR/nginx.conf"
+if [ $? -ne 0 ]; then
+    print_error "Не удалось запустить nginx"
+    cat "$WORK_DIR/error.log"
+    exit 1
+fi
+sleep 1
+
+# Запросов в секунду для URL
+measure_rps() {
+    local url="$1"
+
+    if command -v wrk > /dev/null 2>&1; then
+        wrk -t 2 -c "$CONNECTIONS" -d "${DURATION}s" "$url" | awk '/Requests\/sec/ { print $2 }'
+    else
+        ab -q -k -t "$DURATION" -n 1000000 -c "$CONNECTIONS" "$url" 2>/dev/null | awk '/Requests per second/ { print $4 }'
+    fi
+}
+
+print_info "Нагрузка: ${DURATION} с, $CONNECTIONS соединений"
+
+print_info "Без keepalive к upstream..."
+PLAIN_RPS=$(measure_rps "http://127.0.0.1:$PLAIN_PORT/")
+
+print_info "С keepalive ${NGINX_UPSTREAM_KEEPALIVE:-32}..."
+POOLED_RPS=$(measure_rps "http://127.0.0.1:$POOLED_PORT/")
+
+echo ""
+printf "  %-22s %12s\n" "без keepalive" "$PLAIN_RPS req/s"
+printf "  %-22s %12s\n" "с keepalive" "$POOLED_RPS req/s"
+
+if [ -n "$PLAIN_RPS" ] && [ -n "$POOLED_RPS" ]; then
+    awk -v a="$PLAIN_RPS" -v b="$POOLED_RPS" 'a > 0 { printf "  Прирост: %+.1f%%\n", (b / a - 1) * 100 }'
+fi
\ No newline at end of file